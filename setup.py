@@ -20,7 +20,7 @@ setup(
     extras_require={
         "dev": [
             "pytest>=7.4.3",
-            "pytest-asyncio>=0.21.1",
+            "pytest-asyncio>=0.24.0",
             "httpx>=0.25.1",
         ],
     },
@@ -17,6 +17,9 @@ from .group_manager import GroupManager
 # Get logger for this module
 logger = get_logger(__name__)
 
+# Upper bound on per-device requests in flight for a single group operation
+MAX_CONCURRENT_COMMANDS = 32
+
 class GroupCommandService:
     """
     Service for executing commands on groups of Shelly devices.
@@ -38,10 +41,31 @@ class GroupCommandService:
         self.session = None
         logger.debug("GroupCommandService initialized")
     
+    async def _gather_bounded(self, coros: List[Any]) -> List[Any]:
+        """
+        Run per-device coroutines concurrently with a cap on requests in flight.
+        
+        Args:
+            coros: Coroutines to run
+            
+        Returns:
+            Results in input order; exceptions are returned, not raised
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_COMMANDS)
+        
+        async def guarded(coro):
+            async with semaphore:
+                return await coro
+        
+        return await asyncio.gather(*(guarded(coro) for coro in coros), return_exceptions=True)
+    
     async def start(self):
         """Start the command service."""
         if self.session is None:
-            self.session = aiohttp.ClientSession()
+            # One pooled session for the service lifetime: keep-alive connections
+            # and cached DNS are reused across group operations
+            connector = aiohttp.TCPConnector(limit=100, ttl_dns_cache=300, keepalive_timeout=60)
+            self.session = aiohttp.ClientSession(connector=connector)
             logger.debug("HTTP session initialized")
             
         # If discovery service is provided and not started, start it
@@ -298,12 +322,9 @@ class GroupCommandService:
                 }
             
             # Execute operation on all devices concurrently
-            tasks = []
-            for device in devices:
-                tasks.append(self.send_command(device, action, parameters))
-            
-            # Wait for all tasks to complete
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            results = await self._gather_bounded(
+                [self.send_command(device, action, parameters) for device in devices]
+            )
             
             # Process results
             device_results = {}
@@ -386,34 +407,37 @@ class GroupCommandService:
         if self.session is None:
             await self.start()
         
-        results = {}
-        
-        # Check each device for updates
-        for device in devices:
-            try:
-                if not device.ip_address:
-                    results[device.id] = {
-                        "success": False, 
-                        "error": "IP address unknown"
-                    }
-                    continue
-                
-                # Use appropriate method based on device generation
-                if device.generation == DeviceGeneration.GEN1:
-                    update_info = await self._check_gen1_updates(device)
-                else:
-                    update_info = await self._check_gen2_updates(device)
-                
-                results[device.id] = {
-                    "success": True,
-                    "result": update_info
+        async def check_device(device):
+            if not device.ip_address:
+                return {
+                    "success": False, 
+                    "error": "IP address unknown"
                 }
-            except Exception as e:
-                logger.error(f"Error checking updates for {device.id}: {e}")
+            
+            # Use appropriate method based on device generation
+            if device.generation == DeviceGeneration.GEN1:
+                update_info = await self._check_gen1_updates(device)
+            else:
+                update_info = await self._check_gen2_updates(device)
+            
+            return {
+                "success": True,
+                "result": update_info
+            }
+        
+        # Check all devices for updates concurrently
+        outcomes = await self._gather_bounded([check_device(device) for device in devices])
+        
+        results = {}
+        for device, outcome in zip(devices, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"Error checking updates for {device.id}: {outcome}")
                 results[device.id] = {
                     "success": False,
-                    "error": str(e)
+                    "error": str(outcome)
                 }
+            else:
+                results[device.id] = outcome
         
         return {
             "group": group_name,
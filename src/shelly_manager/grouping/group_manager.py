@@ -2,12 +2,23 @@
 Group manager for handling device groups.
 """
 import os
+import copy
+import functools
+import hashlib
+import io
+import json
+import mmap
 import yaml
 import re
-from typing import Dict, List, Optional, Set, Any
+import stat
+from typing import Dict, FrozenSet, List, Optional, Set, Any, Tuple
 import logging
 from pathlib import Path
 import asyncio
+import atexit
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+import threading
 
 from .models import DeviceGroup
 from ..utils.logging import get_logger
@@ -16,33 +27,336 @@ from ..models.device_registry import device_registry
 # Get the logger for this module
 logger = get_logger(__name__)
 
+# Prefer the libyaml-backed loader/dumper when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _Loader, CSafeDumper as _Dumper
+except ImportError:
+    from yaml import SafeLoader as _Loader, SafeDumper as _Dumper
+
+# Keyword arguments for every group file dump
+_DUMP_KWARGS = {"Dumper": _Dumper, "sort_keys": False, "default_flow_style": False}
+
+# fcntl is POSIX-only; without it journal appends are not locked across processes
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# zstandard is optional; without it group files can only be written as plain YAML
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 DEFAULT_GROUPS_DIR = "data/groups"
 ALL_DEVICES_GROUP_NAME = "all-devices"  # Special group name for all devices
+JOURNAL_SUFFIX = ".journal"  # Per-group append-only log of device additions/removals
+JOURNAL_COMPACT_BYTES = 4096  # Fold a journal back into the group's YAML once it reaches this size
+MMAP_MIN_BYTES = 4096  # Group files at least this large are parsed from a memory map
+COMPRESSED_SUFFIX = ".zst"  # Appended to the names of zstd-compressed group files
+PARALLEL_LOAD_MIN_FILES = 5  # Fewer group files than this are parsed without a thread pool
+LEGACY_GROUPS_FILENAME = "groups.yaml"  # Old main groups file; never read as a group
+GROUP_STORE_FILENAME = "groups.store.yaml"  # Holds every group when storage="single_file"
+STORAGE_MODES = ("per_group", "single_file")
+
+# Characters that are invalid (or awkward) in filenames on common platforms,
+# each mapped to an underscore
+_FILENAME_TRANSLATION = str.maketrans(dict.fromkeys('\x00\\/*?:"<>| ', '_'))
+
+
+@functools.lru_cache(maxsize=1024)
+def _sanitize(name: str) -> str:
+    """Replace characters that cannot appear in a filename with underscores."""
+    return name.translate(_FILENAME_TRANSLATION)
+
+
+_dump_local = threading.local()
+
+
+def _dump(data: Any) -> str:
+    """Dump data as YAML with _DUMP_KWARGS into this thread's reusable buffer."""
+    buf = getattr(_dump_local, "buf", None)
+    if buf is None:
+        buf = _dump_local.buf = io.StringIO()
+    else:
+        buf.seek(0)
+        buf.truncate(0)
+    yaml.dump(data, buf, **_DUMP_KWARGS)
+    return buf.getvalue()
+
+
+# Strings that YAML reads back unchanged when written unquoted: words of letters,
+# digits and _.-/ separated by single spaces, starting with a letter
+_PLAIN_SCALAR = re.compile(r'[A-Za-z][\w.\-/]*(?: [\w.\-/]+)*\Z', re.ASCII)
+# Words that match _PLAIN_SCALAR but would load as booleans or null
+_RESERVED_WORDS = frozenset(
+    variant
+    for word in ("yes", "no", "true", "false", "on", "off", "null")
+    for variant in (word, word.capitalize(), word.upper())
+)
+# Longest string with spaces emitted directly; the YAML emitter wraps longer ones
+_PLAIN_MAX_SPACED = 60
+
+
+def _is_plain(value: Any) -> bool:
+    """Check whether a value can be written as an unquoted YAML scalar as-is."""
+    return (type(value) is str
+            and _PLAIN_SCALAR.match(value) is not None
+            and value not in _RESERVED_WORDS
+            and (len(value) <= _PLAIN_MAX_SPACED or ' ' not in value))
+
+
+def _emit_group(group_dict: Dict[str, Any]) -> Optional[bytes]:
+    """
+    Serialize a group dictionary without going through the generic YAML emitter.
+    
+    Produces the same bytes as yaml.dump with _DUMP_KWARGS. Only handles groups
+    whose names, descriptions, device IDs and tags are all plain scalars; the
+    free-form config is still dumped by PyYAML.
+    
+    Args:
+        group_dict: Dictionary from DeviceGroup.to_dict()
+        
+    Returns:
+        The YAML document, or None if the group needs the full emitter
+    """
+    lines = []
+    for key, value in group_dict.items():
+        if key == "config":
+            lines.append(_dump({key: value}))
+        elif isinstance(value, list):
+            if not all(map(_is_plain, value)):
+                return None
+            if value:
+                lines.append(f"{key}:\n- " + "\n- ".join(value) + "\n")
+            else:
+                lines.append(f"{key}: []\n")
+        elif _is_plain(value):
+            lines.append(f"{key}: {value}\n")
+        else:
+            return None
+    return "".join(lines).encode('utf-8')
+
+
+_zstd_local = threading.local()
+
+
+def _zstd() -> Tuple[Any, Any]:
+    """Get this thread's zstd compressor and decompressor; they are not thread-safe."""
+    contexts = getattr(_zstd_local, "contexts", None)
+    if contexts is None:
+        contexts = _zstd_local.contexts = (zstandard.ZstdCompressor(), zstandard.ZstdDecompressor())
+    return contexts
+
+
+@functools.lru_cache(maxsize=512)
+def _load_group_data_cached(file_path: str, mtime_ns: int, size: int, inode: int) -> Any:
+    """
+    Parse a plain or compressed group file, memoized on the file's identity.
+    
+    Saves replace group files with a new inode, so a changed file always produces
+    a new cache key. Callers must not mutate the result.
+    """
+    with open(file_path, 'rb') as f:
+        if file_path.endswith(COMPRESSED_SUFFIX):
+            return yaml.load(_zstd()[1].decompress(f.read()), Loader=_Loader) or {}
+        # Map larger files instead of copying them through read() buffers
+        if size >= MMAP_MIN_BYTES:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return yaml.load(mm, Loader=_Loader) or {}
+        return yaml.load(f, Loader=_Loader) or {}
+
+
+def _strip_group_suffix(path: str) -> str:
+    """Remove the .yaml or .yaml.zst extension from a group file path."""
+    if path.endswith(COMPRESSED_SUFFIX):
+        path = path[:-len(COMPRESSED_SUFFIX)]
+    return os.path.splitext(path)[0]
+
+
+class _RWLock:
+    """
+    Reader-writer lock: any number of readers, or a single writer.
+    
+    Waiting writers take priority over new readers so a steady stream of reads
+    cannot starve them. Both sides are reentrant per thread, and the thread
+    holding the write lock may also take the read lock.
+    """
+    
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writers_waiting = 0
+        self._writer: Optional[int] = None
+        self._write_depth = 0
+        self._local = threading.local()
+    
+    @contextmanager
+    def gen_rlock(self):
+        """Hold the lock for reading for the duration of the with block."""
+        me = threading.get_ident()
+        depth = getattr(self._local, "read_depth", 0)
+        if depth or self._writer == me:
+            # Already reading, or writing, on this thread
+            self._local.read_depth = depth + 1
+            try:
+                yield
+            finally:
+                self._local.read_depth = depth
+            return
+        
+        with self._cond:
+            while self._writer is not None or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        self._local.read_depth = 1
+        try:
+            yield
+        finally:
+            self._local.read_depth = 0
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+    
+    @contextmanager
+    def gen_wlock(self):
+        """Hold the lock for writing for the duration of the with block."""
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer != me:
+                self._writers_waiting += 1
+                try:
+                    while self._writer is not None or self._readers:
+                        self._cond.wait()
+                finally:
+                    self._writers_waiting -= 1
+                self._writer = me
+            self._write_depth += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._write_depth -= 1
+                if not self._write_depth:
+                    self._writer = None
+                    self._cond.notify_all()
 
 class GroupManager:
     """
     Manager for Shelly device groups.
     
     This class handles the creation, modification, and persistence of device groups.
-    Groups are stored in individual YAML files in the specified directory.
+    Groups are stored in individual YAML files in the specified directory and are
+    read from it the first time they are needed. Each save
+    writes a temporary file and renames it over the old one, so readers never see a
+    partially written group.
+    
+    By default every change is written to disk immediately. With a flush_interval,
+    changes are batched instead: modified groups are marked dirty and written once
+    per burst by a background thread, on flush(), and at interpreter exit. Call
+    close() when done with such a manager to stop the thread and write what is left.
+    
+    With compress, group files are written zstd-compressed as <name>.yaml.zst.
+    Both plain and compressed files are always read.
+    
+    With use_journal, adding or removing a device appends a one-line record to the
+    group's journal file instead of rewriting its YAML. Journals are replayed and
+    compacted into the YAML when groups are loaded or once they grow large.
+    
+    With storage="single_file", all groups are kept in one groups.store.yaml in the groups
+    directory instead, so loading is a single parse. Each change rewrites that file;
+    combine it with a flush_interval to write bursts of changes once. Compression and
+    journals are per-group-file features and are not available in this mode.
     """
     
-    def __init__(self, groups_dir: Optional[str] = None):
+    def __init__(self, groups_dir: Optional[str] = None, flush_interval: Optional[float] = None,
+                 use_journal: bool = False, durable: bool = False, compress: bool = False,
+                 storage: str = "per_group"):
         """
         Initialize the group manager.
         
         Args:
             groups_dir: Directory to store group files. If None, uses the environment variable
                         SHELLY_GROUPS_DIR or the default directory.
+            flush_interval: If set, defer group file writes and flush dirty groups this many
+                            seconds after the first change in a burst. If None, write immediately.
+            use_journal: Record device additions/removals in per-group journal files
+                         instead of rewriting the group file.
+            durable: fsync each group file before it replaces the previous version, so
+                     saves survive a power loss and not just a crash of this process.
+            compress: Write group files zstd-compressed. Requires the zstandard package;
+                      ignored with a warning if it is not installed.
+            storage: "per_group" to keep each group in its own file, or "single_file"
+                     to keep all groups in one groups.store.yaml.
+            
+        Raises:
+            ValueError: If storage is not one of STORAGE_MODES
         """
+        if storage not in STORAGE_MODES:
+            raise ValueError(f"Unknown group storage '{storage}', expected one of {STORAGE_MODES}")
+        self.storage = storage
+        
         # Check for environment variable first, then use argument, then default
         self.groups_dir = os.environ.get('SHELLY_GROUPS_DIR') or groups_dir or DEFAULT_GROUPS_DIR
-        self.groups: Dict[str, DeviceGroup] = {}
+        
+        # Groups are read from disk on first use; see the groups property
+        self._groups: Optional[Dict[str, DeviceGroup]] = None
+        self._load_lock = threading.Lock()
+        
+        # Guards self.groups: lookups share it, changes to groups take it exclusively
+        self._groups_lock = _RWLock()
+        
+        # Device ID -> names of the groups containing it; rebuilt on first lookup
+        # after groups are loaded, created, replaced or deleted
+        self._device_index: Optional[Dict[str, Set[str]]] = None
+        # get_all_devices() result; dropped whenever the index gains or loses a device
+        self._all_devices: Optional[FrozenSet[str]] = None
+        
+        # Set when the single-file store exists but cannot be parsed; it is then never overwritten
+        self._store_unreadable = False
+        
+        # Deferred write state
+        self.flush_interval = flush_interval
+        self._lock = threading.RLock()
+        self._dirty: Set[str] = set()
+        self._flush_wakeup = threading.Event()
+        self._flush_stop = threading.Event()
+        self._flush_thread: Optional[threading.Thread] = None
+        
+        if storage == "single_file" and (use_journal or compress):
+            logger.warning("Journals and compression need per-group files; ignoring them for single-file storage")
+            use_journal = compress = False
+        
+        # Journal state: group name -> cached append-only file descriptor
+        self.use_journal = use_journal
+        self._journal_fds: Dict[str, int] = {}
+        
+        # Whether group files are fsynced before being moved into place
+        self.durable = durable
+        
+        # Whether group files are written compressed
+        if compress and zstandard is None:
+            logger.warning("zstandard is not installed; writing uncompressed group files")
+            compress = False
+        self.compress = compress
+        
+        # Group file path -> (digest of the payload last written there, inode it was written to)
+        self._last_hash: Dict[str, Tuple[bytes, int]] = {}
         
         logger.debug(f"Initializing GroupManager with groups directory: {self.groups_dir}")
         
-        # Load existing groups
-        self._load_groups()
+        # Create the groups directory up front; reading it is left until first use
+        try:
+            os.makedirs(self.groups_dir, exist_ok=True)
+        except OSError as e:
+            logger.error(f"Failed to create groups directory {self.groups_dir}: {str(e)}")
+        
+        if flush_interval is not None:
+            self._flush_thread = threading.Thread(target=self._flush_loop, name="GroupManagerFlush", daemon=True)
+            self._flush_thread.start()
+            # Unregistered again by close(), which also stops the flush thread
+            atexit.register(self.flush)
     
     def _sanitize_filename(self, name: str) -> str:
         """
@@ -54,11 +368,7 @@ class GroupManager:
         Returns:
             Sanitized name safe for use as a filename
         """
-        # Replace invalid filename characters with underscores
-        sanitized = re.sub(r'[\\/*?:"<>|]', '_', name)
-        # Ensure no spaces in filename
-        sanitized = sanitized.replace(' ', '_')
-        return sanitized
+        return _sanitize(name)
     
     def _get_group_file_path(self, group_name: str) -> str:
         """
@@ -68,57 +378,222 @@ class GroupManager:
             group_name: Name of the group
             
         Returns:
-            Full path to the group's YAML file
+            Full path to the group's YAML file (.yaml.zst when compressing), or to
+            the shared groups.store.yaml with single-file storage
         """
-        filename = f"{self._sanitize_filename(group_name)}.yaml"
+        if self.storage == "single_file":
+            return os.path.join(self.groups_dir, GROUP_STORE_FILENAME)
+        filename = f"{_sanitize(group_name)}.yaml"
+        if self.compress:
+            filename += COMPRESSED_SUFFIX
         return os.path.join(self.groups_dir, filename)
     
+    def _group_file_path(self, group: DeviceGroup) -> str:
+        """
+        Get the file path for a group, caching it on the group.
+        
+        Args:
+            group: The group
+            
+        Returns:
+            Full path to the group's YAML file
+        """
+        if group._file_path is None:
+            group._file_path = self._get_group_file_path(group.name)
+        return group._file_path
+    
+    @property
+    def groups(self) -> Dict[str, DeviceGroup]:
+        """
+        Groups by name, loaded from the groups directory on first access.
+        """
+        if self._groups is None:
+            with self._load_lock:
+                if self._groups is None:
+                    self._groups = self._read_groups()
+        return self._groups
+    
+    @groups.setter
+    def groups(self, groups: Dict[str, DeviceGroup]) -> None:
+        self._groups = groups
+        self._drop_device_index()
+    
+    def _drop_device_index(self) -> None:
+        """
+        Forget the device index and the cached device set so they are rebuilt on next use.
+        """
+        self._device_index = None
+        self._all_devices = None
+    
+    def _get_device_index(self) -> Dict[str, Set[str]]:
+        """
+        Get the device ID -> group names index, building it if needed.
+        
+        Callers must hold the groups lock (shared or exclusive).
+        
+        Returns:
+            Dict[str, Set[str]]: Names of the groups containing each device
+        """
+        index = self._device_index
+        if index is None:
+            index = {}
+            for name, group in self.groups.items():
+                for device_id in group.device_ids:
+                    index.setdefault(device_id, set()).add(name)
+            self._device_index = index
+        return index
+    
     def _load_groups(self) -> None:
         """
         Load all group definitions from YAML files in the groups directory.
         """
-        self.groups = {}
+        groups = self._read_groups()
+        with self._groups_lock.gen_wlock():
+            self.groups = groups
+    
+    def _read_groups(self) -> Dict[str, DeviceGroup]:
+        """
+        Read all group definitions from YAML files in the groups directory.
+        
+        Returns:
+            Dict[str, DeviceGroup]: Groups by name; empty if the directory can't be read
+        """
+        if self.storage == "single_file":
+            return self._read_group_store()
+        
+        groups: Dict[str, DeviceGroup] = {}
         
         try:
             # Create the groups directory if it doesn't exist
             os.makedirs(self.groups_dir, exist_ok=True)
             
-            # Find all YAML files in the directory
-            for filename in os.listdir(self.groups_dir):
-                # Skip the main groups.yaml file and any backup files
-                if filename == 'groups.yaml' or filename.endswith('.bak'):
+            # Find all group YAML files in the directory with a single scan,
+            # skipping the main groups.yaml file, the single-file store and any backup files
+            with os.scandir(self.groups_dir) as entries:
+                paths = [entry.path for entry in entries
+                         if (entry.name.endswith('.yaml')
+                             and entry.name not in (LEGACY_GROUPS_FILENAME, GROUP_STORE_FILENAME)
+                             or entry.name.endswith('.yaml' + COMPRESSED_SUFFIX))
+                         and entry.is_file()]
+            
+            # Parse the files concurrently; results come back in scan order. A few
+            # files parse faster than a thread pool starts, so read those directly
+            if len(paths) >= PARALLEL_LOAD_MIN_FILES:
+                with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as executor:
+                    parsed = list(executor.map(self._parse_group_file, paths))
+            else:
+                parsed = [self._parse_group_file(path) for path in paths]
+            
+            sources: Dict[str, str] = {}
+            for file_path, (group, replayed) in zip(paths, parsed):
+                if group is None:
                     continue
-                    
-                if not filename.endswith('.yaml'):
+                
+                # A group saved both plain and compressed (after switching modes): newest wins
+                previous = sources.get(group.name)
+                if previous is not None and os.stat(previous).st_mtime_ns > os.stat(file_path).st_mtime_ns:
                     continue
-                    
-                file_path = os.path.join(self.groups_dir, filename)
+                sources[group.name] = file_path
                 
-                try:
-                    with open(file_path, 'r') as f:
-                        group_data = yaml.safe_load(f) or {}
-                    
-                    if not isinstance(group_data, dict):
-                        logger.warning(f"Invalid group data in {file_path}: not a dictionary")
-                        continue
-                    
-                    # Get the group name - either from the data or from the filename
-                    if "name" not in group_data:
-                        # Extract name from filename (remove .yaml extension)
-                        group_name = os.path.splitext(filename)[0]
-                        group_data["name"] = group_name
-                    
-                    group = DeviceGroup.from_dict(group_data)
-                    self.groups[group.name] = group
-                    logger.debug(f"Loaded group '{group.name}' from {file_path}")
-                except Exception as e:
-                    logger.error(f"Failed to load group from {file_path}: {str(e)}")
-            
-            logger.info(f"Loaded {len(self.groups)} groups from {self.groups_dir}")
+                # Compact any journaled device changes into the group file
+                if replayed:
+                    self._save_group(group)
+                
+                groups[group.name] = group
+                logger.debug(f"Loaded group '{group.name}' from {file_path}")
+            
+            logger.info(f"Loaded {len(groups)} groups from {self.groups_dir}")
             
         except Exception as e:
             logger.error(f"Failed to load groups: {str(e)}")
-            self.groups = {}
+            groups = {}
+        
+        return groups
+    
+    def _read_group_store(self) -> Dict[str, DeviceGroup]:
+        """
+        Read all groups from the single groups.store.yaml used with single-file storage.
+        
+        A store that cannot be parsed is left alone: saves are refused until it is
+        fixed or removed, rather than replacing it with the (empty) in-memory groups.
+        
+        Returns:
+            Dict[str, DeviceGroup]: Groups by name; empty if the file is missing or invalid
+        """
+        store_path = os.path.join(self.groups_dir, GROUP_STORE_FILENAME)
+        groups: Dict[str, DeviceGroup] = {}
+        self._store_unreadable = False
+        try:
+            st = os.stat(store_path)
+        except FileNotFoundError:
+            logger.info(f"No group store at {store_path}, starting with no groups")
+            return groups
+        
+        try:
+            data = copy.deepcopy(_load_group_data_cached(store_path, st.st_mtime_ns, st.st_size, st.st_ino))
+            if data is None:
+                logger.info(f"Group store {store_path} is empty")
+                return groups
+            if not isinstance(data, dict) or not isinstance(data.get("groups"), list):
+                logger.error(f"Invalid group store {store_path}: expected a 'groups' list; not overwriting it")
+                self._store_unreadable = True
+                return groups
+            
+            for group_data in data["groups"]:
+                if not isinstance(group_data, dict) or "name" not in group_data:
+                    logger.warning(f"Skipping invalid group entry in {store_path}")
+                    continue
+                group = DeviceGroup.from_dict(group_data)
+                group._file_path = store_path
+                groups[group.name] = group
+            
+            logger.info(f"Loaded {len(groups)} groups from {store_path}")
+        except Exception as e:
+            logger.error(f"Failed to load groups from {store_path}: {str(e)}; not overwriting it")
+            self._store_unreadable = True
+            groups = {}
+        
+        return groups
+    
+    def _parse_group_file(self, file_path: str) -> Tuple[Optional[DeviceGroup], int]:
+        """
+        Parse one group file and apply its journal, if any.
+        
+        Safe to call from worker threads: it only reads files.
+        
+        Args:
+            file_path: Path of the group's YAML file
+            
+        Returns:
+            The group (None if the file is invalid) and the number of journal records applied
+        """
+        try:
+            if file_path.endswith(COMPRESSED_SUFFIX) and zstandard is None:
+                logger.warning(f"Skipping {file_path}: zstandard is not installed")
+                return None, 0
+            
+            # Unchanged files (e.g. when another manager reloads the directory) are parsed once
+            st = os.stat(file_path)
+            group_data = copy.deepcopy(
+                _load_group_data_cached(file_path, st.st_mtime_ns, st.st_size, st.st_ino)
+            )
+            
+            if not isinstance(group_data, dict):
+                logger.warning(f"Invalid group data in {file_path}: not a dictionary")
+                return None, 0
+            
+            # Get the group name - either from the data or from the filename
+            if "name" not in group_data:
+                # Extract name from filename (remove .yaml/.yaml.zst extension)
+                group_data["name"] = os.path.basename(_strip_group_suffix(file_path))
+            
+            group = DeviceGroup.from_dict(group_data)
+            group._file_path = self._get_group_file_path(group.name)
+            replayed = self._replay_journal(group, _strip_group_suffix(file_path) + JOURNAL_SUFFIX)
+            return group, replayed
+        except Exception as e:
+            logger.error(f"Failed to load group from {file_path}: {str(e)}")
+            return None, 0
     
     def _save_group(self, group: DeviceGroup) -> bool:
         """
@@ -130,26 +605,389 @@ class GroupManager:
         Returns:
             bool: True if the save was successful, False otherwise
         """
+        if self.storage == "single_file":
+            return self._save_group_store()
+        
         try:
             # Create the groups directory if it doesn't exist
             os.makedirs(self.groups_dir, exist_ok=True)
             
             # Get the file path
-            file_path = self._get_group_file_path(group.name)
+            file_path = self._group_file_path(group)
             
             # Convert the group to a dictionary
             group_dict = group.to_dict()
             
-            # Save to YAML file
-            with open(file_path, 'w') as f:
-                yaml.dump(group_dict, f, sort_keys=False, default_flow_style=False)
+            # Save to YAML file, unless it already holds exactly this payload
+            payload = _emit_group(group_dict)
+            if payload is None:
+                payload = _dump(group_dict).encode('utf-8')
+            digest = hashlib.blake2b(payload, digest_size=16).digest()
+            if not self._is_unchanged(file_path, digest):
+                if file_path not in self._last_hash:
+                    # First write from this manager: drop a copy left in the other format
+                    self._remove_other_format(file_path)
+                if self.compress:
+                    payload = _zstd()[0].compress(payload)
+                inode = self._write_atomic(file_path, payload)
+                self._last_hash[file_path] = (digest, inode)
+                logger.debug(f"Saved group '{group.name}' to {file_path}")
+            else:
+                logger.debug(f"Group '{group.name}' unchanged, not rewriting {file_path}")
             
-            logger.debug(f"Saved group '{group.name}' to {file_path}")
+            # The file now holds the full state, so any journal is obsolete
+            self._discard_journal(group.name)
             return True
         except Exception as e:
             logger.error(f"Failed to save group '{group.name}': {str(e)}")
             return False
     
+    def _save_group_store(self) -> bool:
+        """
+        Write every group to the single groups.store.yaml used with single-file storage.
+        
+        Returns:
+            bool: True if the save was successful, False otherwise (including when
+                  the existing store could not be parsed and is kept as it is)
+        """
+        store_path = os.path.join(self.groups_dir, GROUP_STORE_FILENAME)
+        try:
+            # Serialize under the read lock so no group changes halfway through. Reading
+            # self.groups also loads the store, which decides whether it may be replaced
+            with self._groups_lock.gen_rlock():
+                groups = list(self.groups.values())
+                if self._store_unreadable:
+                    logger.error(f"Not saving groups: {store_path} could not be parsed; fix or remove it first")
+                    return False
+                payload = _dump({"groups": [group.to_dict() for group in groups]}).encode('utf-8')
+            
+            os.makedirs(self.groups_dir, exist_ok=True)
+            digest = hashlib.blake2b(payload, digest_size=16).digest()
+            if self._is_unchanged(store_path, digest):
+                logger.debug(f"Groups unchanged, not rewriting {store_path}")
+                return True
+            
+            inode = self._write_atomic(store_path, payload)
+            self._last_hash[store_path] = (digest, inode)
+            logger.debug(f"Saved {len(groups)} groups to {store_path}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save groups to {store_path}: {str(e)}")
+            return False
+    
+    @staticmethod
+    def _remove_other_format(file_path: str) -> None:
+        """
+        Remove the plain or compressed counterpart of a group file, if there is one.
+        
+        Args:
+            file_path: Path of the group file being kept
+        """
+        if file_path.endswith(COMPRESSED_SUFFIX):
+            other = file_path[:-len(COMPRESSED_SUFFIX)]
+        else:
+            other = file_path + COMPRESSED_SUFFIX
+        try:
+            os.remove(other)
+        except FileNotFoundError:
+            pass
+    
+    def _is_unchanged(self, file_path: str, digest: bytes) -> bool:
+        """
+        Check whether a group file still holds the payload this manager last wrote to it.
+        
+        Args:
+            file_path: Path of the group's YAML file
+            digest: Digest of the payload about to be written
+            
+        Returns:
+            bool: True if the same payload was last written and the file has not been
+                  replaced or deleted since
+        """
+        last = self._last_hash.get(file_path)
+        if last is None or last[0] != digest:
+            return False
+        try:
+            # Every save publishes a new inode, so a different one means another writer
+            return os.stat(file_path).st_ino == last[1]
+        except FileNotFoundError:
+            return False
+    
+    def _write_atomic(self, file_path: str, payload: bytes) -> int:
+        """
+        Replace a file's contents in a single step.
+        
+        The payload is written to a temporary file next to the target, which is
+        then renamed over it, so the target always holds either the old or the
+        new contents in full.
+        
+        Args:
+            file_path: Path of the file to replace
+            payload: Complete new contents
+            
+        Returns:
+            int: Inode of the newly published file
+            
+        Raises:
+            OSError: If the file could not be written or replaced
+        """
+        # Unique per writer so concurrent saves of the same group cannot collide
+        tmp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            try:
+                previous = os.stat(file_path)
+            except FileNotFoundError:
+                previous = None
+            
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+            try:
+                # os.write may write fewer bytes than asked for
+                view = memoryview(payload)
+                while view:
+                    view = view[os.write(fd, view):]
+                
+                # Keep the mode and, where permitted, the owner of the file being replaced
+                if previous is not None and hasattr(os, "fchmod"):
+                    os.fchmod(fd, stat.S_IMODE(previous.st_mode))
+                    current = os.fstat(fd)
+                    if (current.st_uid, current.st_gid) != (previous.st_uid, previous.st_gid):
+                        try:
+                            os.fchown(fd, previous.st_uid, previous.st_gid)
+                        except PermissionError:
+                            logger.debug(f"Cannot keep the owner of {file_path}; it is now owned by this user")
+                
+                if self.durable:
+                    os.fsync(fd)
+                inode = os.fstat(fd).st_ino
+            finally:
+                os.close(fd)
+            os.replace(tmp_path, file_path)
+            return inode
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+    
+    def _persist_group(self, group: DeviceGroup) -> bool:
+        """
+        Write a changed group to disk now, or mark it dirty when writes are deferred.
+        
+        Args:
+            group: The group that changed
+            
+        Returns:
+            bool: True if the group was saved or queued, False if the save failed
+        """
+        if self.flush_interval is None:
+            return self._save_group(group)
+        
+        with self._lock:
+            self._dirty.add(group.name)
+        self._flush_wakeup.set()
+        return True
+    
+    def flush(self) -> bool:
+        """
+        Write all dirty groups to disk.
+        
+        A no-op when writes are not deferred or nothing has changed. Groups that
+        fail to save stay dirty, so the next flush retries them.
+        
+        Returns:
+            bool: True if every dirty group was written, False otherwise
+        """
+        # Groups lock before self._lock, the same order as the methods that change groups
+        with self._groups_lock.gen_rlock(), self._lock:
+            dirty, self._dirty = self._dirty, set()
+            failed: Set[str] = set()
+            if self.storage == "single_file":
+                # One write covers every dirty (or deleted) group
+                if dirty and not self._save_group_store():
+                    failed = dirty
+            else:
+                for group_name in dirty:
+                    group = self.groups.get(group_name)
+                    if group is not None and not self._save_group(group):
+                        failed.add(group_name)
+            self._dirty |= failed
+        
+        if failed:
+            logger.error(f"Failed to flush {len(failed)} of {len(dirty)} dirty groups; they will be retried")
+            return False
+        if dirty:
+            logger.debug(f"Flushed {len(dirty)} dirty groups to {self.groups_dir}")
+        return True
+    
+    def _flush_loop(self) -> None:
+        """
+        Background loop that flushes dirty groups once per burst of changes, until close().
+        """
+        while not self._flush_stop.is_set():
+            self._flush_wakeup.wait()
+            # Let the rest of the burst accumulate before writing; close() cuts the wait short
+            if self._flush_stop.wait(self.flush_interval):
+                break
+            self._flush_wakeup.clear()
+            self.flush()
+    
+    def _get_journal_path(self, group_name: str) -> str:
+        """
+        Get the journal file path for a group.
+        
+        Args:
+            group_name: Name of the group
+            
+        Returns:
+            Full path to the group's journal file
+        """
+        return _strip_group_suffix(self._get_group_file_path(group_name)) + JOURNAL_SUFFIX
+    
+    def _open_journal(self, group_name: str, path: str) -> int:
+        """
+        Get the cached append descriptor for a group's journal, (re)opening it if needed.
+        
+        Args:
+            group_name: Name of the group
+            path: Path of the group's journal file
+            
+        Returns:
+            int: File descriptor open for appending
+        """
+        fd = self._journal_fds.get(group_name)
+        if fd is not None:
+            if self._fd_is_current(fd, path):
+                return fd
+            # Compacted away (possibly by another manager); start a new journal
+            os.close(fd)
+        
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._journal_fds[group_name] = fd
+        return fd
+    
+    @staticmethod
+    def _fd_is_current(fd: int, path: str) -> bool:
+        """Check that an open descriptor still refers to the file at path."""
+        try:
+            return os.fstat(fd).st_ino == os.stat(path).st_ino
+        except FileNotFoundError:
+            return False
+    
+    def _append_journal(self, group: DeviceGroup, op: str, device_id: str) -> bool:
+        """
+        Append a device change to a group's journal, compacting it when it grows large.
+        
+        Args:
+            group: The group that changed (already updated in memory)
+            op: "add" or "remove"
+            device_id: ID of the device that was added or removed
+            
+        Returns:
+            bool: True if the change was recorded, False otherwise
+        """
+        record = (json.dumps({"op": op, "id": device_id}) + "\n").encode("utf-8")
+        path = _strip_group_suffix(self._group_file_path(group)) + JOURNAL_SUFFIX
+        
+        try:
+            with self._lock:
+                while True:
+                    fd = self._open_journal(group.name, path)
+                    if fcntl:
+                        fcntl.flock(fd, fcntl.LOCK_EX)
+                    try:
+                        # Re-check under the lock in case the journal was compacted meanwhile
+                        if self._fd_is_current(fd, path):
+                            os.write(fd, record)
+                            size = os.fstat(fd).st_size
+                            break
+                    finally:
+                        if fcntl:
+                            fcntl.flock(fd, fcntl.LOCK_UN)
+        except OSError as e:
+            logger.error(f"Failed to journal change for group '{group.name}': {str(e)}")
+            return self._save_group(group)
+        
+        if size >= JOURNAL_COMPACT_BYTES:
+            return self._save_group(group)
+        return True
+    
+    def _replay_journal(self, group: DeviceGroup, journal_path: str) -> int:
+        """
+        Apply the records in a journal file to a group.
+        
+        Args:
+            group: The group loaded from its YAML file
+            journal_path: Path of the group's journal file
+            
+        Returns:
+            int: Number of records applied
+        """
+        try:
+            f = open(journal_path, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            return 0
+        
+        applied = 0
+        with f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn final line from an interrupted append
+                    logger.warning(f"Skipping unreadable record in {journal_path}")
+                    continue
+                
+                if record.get("op") == "add":
+                    group.add_device(record["id"])
+                elif record.get("op") == "remove":
+                    group.remove_device(record["id"])
+                applied += 1
+        
+        logger.debug(f"Replayed {applied} journal records for group '{group.name}'")
+        return applied
+    
+    def _discard_journal(self, group_name: str) -> None:
+        """
+        Remove a group's journal file and close its cached descriptor.
+        
+        Args:
+            group_name: Name of the group
+        """
+        path = self._get_journal_path(group_name)
+        fd = self._journal_fds.pop(group_name, None)
+        if fd is None:
+            try:
+                fd = os.open(path, os.O_WRONLY)
+            except FileNotFoundError:
+                return
+        
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        finally:
+            os.close(fd)
+    
+    def close(self) -> None:
+        """
+        Stop the flush thread, flush pending writes and release cached journal descriptors.
+        """
+        if self._flush_thread is not None:
+            self._flush_stop.set()
+            self._flush_wakeup.set()
+            self._flush_thread.join()
+            self._flush_thread = None
+            atexit.unregister(self.flush)
+        self.flush()
+        with self._lock:
+            for fd in self._journal_fds.values():
+                os.close(fd)
+            self._journal_fds.clear()
+    
     def _delete_group_file(self, group_name: str) -> bool:
         """
         Delete a group's YAML file.
@@ -160,8 +998,20 @@ class GroupManager:
         Returns:
             bool: True if the file was deleted, False otherwise
         """
+        if self.storage == "single_file":
+            # The group is already gone from memory; rewrite the store without it
+            if self.flush_interval is None:
+                return self._save_group_store()
+            with self._lock:
+                self._dirty.add(group_name)
+            self._flush_wakeup.set()
+            return True
+        
         try:
             file_path = self._get_group_file_path(group_name)
+            self._discard_journal(group_name)
+            self._last_hash.pop(file_path, None)
+            self._remove_other_format(file_path)
             
             if os.path.exists(file_path):
                 os.remove(file_path)
@@ -181,8 +1031,9 @@ class GroupManager:
         Note: This is provided for backward compatibility.
         New code should use _save_group for individual groups.
         """
-        for group in self.groups.values():
-            self._save_group(group)
+        with self._groups_lock.gen_rlock():
+            for group in self.groups.values():
+                self._save_group(group)
     
     async def load_groups(self) -> None:
         """
@@ -216,21 +1067,25 @@ class GroupManager:
         Raises:
             ValueError: If a group with this name already exists
         """
-        if name in self.groups:
-            raise ValueError(f"Group '{name}' already exists")
-        
-        # Create new group
-        group = DeviceGroup(
-            name=name,
-            description=description or "",
-            device_ids=device_ids or [],
-            tags=tags or [],
-            config=config or {}
-        )
-        
-        # Add to collection and save
-        self.groups[name] = group
-        self._save_group(group)
+        with self._groups_lock.gen_wlock():
+            if name in self.groups:
+                raise ValueError(f"Group '{name}' already exists")
+            
+            # Create new group
+            group = DeviceGroup(
+                name=name,
+                description=description or "",
+                device_ids=device_ids or [],
+                tags=tags or [],
+                config=config or {}
+            )
+            
+            group._file_path = self._get_group_file_path(name)
+            
+            # Add to collection and save
+            self.groups[name] = group
+            self._drop_device_index()
+            self._persist_group(group)
         
         logger.info(f"Created group '{name}' with {len(group.device_ids)} devices")
         return group
@@ -281,14 +1136,17 @@ class GroupManager:
         Raises:
             ValueError: If the group doesn't exist
         """
-        if group.name not in self.groups:
-            raise ValueError(f"Group '{group.name}' doesn't exist")
-        
-        # Update the group
-        self.groups[group.name] = group
-        
-        # Save changes
-        self._save_group(group)
+        with self._groups_lock.gen_wlock():
+            if group.name not in self.groups:
+                raise ValueError(f"Group '{group.name}' doesn't exist")
+            
+            # Update the group; it may come from elsewhere, so re-derive its file path
+            group._file_path = self._get_group_file_path(group.name)
+            self.groups[group.name] = group
+            self._drop_device_index()
+            
+            # Save changes
+            self._persist_group(group)
         
         logger.info(f"Updated group '{group.name}'")
     
@@ -315,17 +1173,18 @@ class GroupManager:
         Raises:
             ValueError: If the group doesn't exist
         """
-        group = self.get_group(group_name)
-        if not group:
-            raise ValueError(f"Group '{group_name}' doesn't exist")
-        
-        # Update the group properties
-        group.device_ids = device_ids
-        if description is not None:
-            group.description = description
-        
-        # Save the updated group
-        self._update_group(group)
+        with self._groups_lock.gen_wlock():
+            group = self.get_group(group_name)
+            if not group:
+                raise ValueError(f"Group '{group_name}' doesn't exist")
+            
+            # Update the group properties
+            group.device_ids = device_ids
+            if description is not None:
+                group.description = description
+            
+            # Save the updated group
+            self._update_group(group)
         
         return group
     
@@ -339,14 +1198,18 @@ class GroupManager:
         Returns:
             bool: True if the group was deleted, False if it didn't exist
         """
-        if group_name not in self.groups:
-            return False
-        
-        # Remove the group from memory
-        del self.groups[group_name]
-        
-        # Delete the group file
-        self._delete_group_file(group_name)
+        with self._groups_lock.gen_wlock():
+            if group_name not in self.groups:
+                return False
+            
+            # Remove the group from memory, dropping any pending write
+            with self._lock:
+                del self.groups[group_name]
+                self._dirty.discard(group_name)
+            self._drop_device_index()
+            
+            # Delete the group file
+            self._delete_group_file(group_name)
         
         logger.info(f"Deleted group '{group_name}'")
         return True
@@ -379,8 +1242,9 @@ class GroupManager:
         # Handle special "all-devices" group
         if group_name == ALL_DEVICES_GROUP_NAME:
             return self._get_all_devices_group()
-            
-        return self.groups.get(group_name)
+        
+        with self._groups_lock.gen_rlock():
+            return self.groups.get(group_name)
     
     def _get_all_devices_group(self) -> DeviceGroup:
         """
@@ -409,12 +1273,15 @@ class GroupManager:
         List all groups.
         
         Returns:
-            List of all groups, including the special all-devices group
+            List of all groups, including the special all-devices group. The list is a
+            snapshot and can be iterated without holding any lock.
         """
-        groups_list = list(self.groups.values())
+        with self._groups_lock.gen_rlock():
+            groups_list = list(self.groups.values())
+            has_all_devices = ALL_DEVICES_GROUP_NAME in self.groups
         
         # Add the special all-devices group if it doesn't already exist
-        if ALL_DEVICES_GROUP_NAME not in self.groups:
+        if not has_all_devices:
             groups_list.append(self._get_all_devices_group())
             
         return groups_list
@@ -436,18 +1303,26 @@ class GroupManager:
         Raises:
             KeyError: If the group doesn't exist
         """
-        group = self.get_group(group_name)
-        if not group:
-            raise KeyError(f"Group '{group_name}' does not exist")
-        
-        # Check if device already in group
-        if device_id in group.device_ids:
-            logger.debug(f"Device {device_id} already in group '{group_name}'")
-            return True
-        
-        # Add device to group
-        group.add_device(device_id)
-        self._save_group(group)
+        with self._groups_lock.gen_wlock():
+            group = self.get_group(group_name)
+            if not group:
+                raise KeyError(f"Group '{group_name}' does not exist")
+            
+            # Check if device already in group
+            if device_id in group.device_ids:
+                logger.debug(f"Device {device_id} already in group '{group_name}'")
+                return True
+            
+            # Add device to group
+            group.add_device(device_id)
+            if self._device_index is not None and group_name in self.groups:
+                if device_id not in self._device_index:
+                    self._all_devices = None
+                self._device_index.setdefault(device_id, set()).add(group_name)
+            if self.use_journal:
+                self._append_journal(group, "add", device_id)
+            else:
+                self._persist_group(group)
         
         logger.info(f"Added device {device_id} to group '{group_name}'")
         return True
@@ -463,14 +1338,27 @@ class GroupManager:
         Returns:
             bool: True if the device was removed, False if the group or device doesn't exist
         """
-        group = self.get_group(group_name)
-        if not group:
-            logger.warning(f"Attempted to remove device from non-existent group '{group_name}'")
-            return False
+        with self._groups_lock.gen_wlock():
+            group = self.get_group(group_name)
+            if not group:
+                logger.warning(f"Attempted to remove device from non-existent group '{group_name}'")
+                return False
+            
+            # Remove device from group
+            removed = group.remove_device(device_id)
+            if removed:
+                names = (self._device_index or {}).get(device_id)
+                if names is not None:
+                    names.discard(group_name)
+                    if not names:
+                        del self._device_index[device_id]
+                        self._all_devices = None
+                if self.use_journal:
+                    self._append_journal(group, "remove", device_id)
+                else:
+                    self._persist_group(group)
         
-        # Remove device from group
-        if group.remove_device(device_id):
-            self._save_group(group)
+        if removed:
             logger.info(f"Removed device {device_id} from group '{group_name}'")
             return True
         
@@ -485,9 +1373,14 @@ class GroupManager:
             device_id: ID of the device
             
         Returns:
-            List[DeviceGroup]: List of groups containing the device
+            List[DeviceGroup]: List of groups containing the device, in group order
         """
-        return [group for group in self.groups.values() if group.has_device(device_id)]
+        with self._groups_lock.gen_rlock():
+            names = self._get_device_index().get(device_id, ())
+            if len(names) <= 1:
+                return [self.groups[name] for name in names]
+            # Keep the order of self.groups; iterating the set would follow string hashing
+            return [group for name, group in self.groups.items() if name in names]
     
     def get_devices_in_group(self, group_name: str) -> List[str]:
         """
@@ -508,16 +1401,20 @@ class GroupManager:
         
         return group.device_ids.copy()
     
-    def get_all_devices(self) -> Set[str]:
+    def get_all_devices(self) -> FrozenSet[str]:
         """
         Get all device IDs across all groups.
         
+        The set is cached until a device joins its first group or leaves its last one.
+        
         Returns:
-            Set[str]: Set of all unique device IDs
+            FrozenSet[str]: Set of all unique device IDs
         """
-        all_devices = set()
-        for group in self.groups.values():
-            all_devices.update(group.device_ids)
+        with self._groups_lock.gen_rlock():
+            all_devices = self._all_devices
+            if all_devices is None:
+                all_devices = frozenset(self._get_device_index())
+                self._all_devices = all_devices
         
         return all_devices
 
@@ -1,20 +1,125 @@
 """
 Models for defining device groups.
 """
-from typing import List, Dict, Any, Optional
+import sys
+from typing import List, Dict, Any, Optional, Iterable
 from dataclasses import dataclass, field
 
 
+def _intern(device_id: Any) -> Any:
+    """Intern string device IDs so groups sharing a device share one string object."""
+    return sys.intern(device_id) if type(device_id) is str else device_id
+
+
+class DeviceIdList(list):
+    """
+    A list of device IDs with a hash index for constant-time membership tests.
+    
+    It behaves exactly like a plain list (order, duplicates, equality with lists);
+    every mutating method keeps the index in step, and string IDs are interned.
+    """
+    __slots__ = ("_counts",)
+    
+    def __init__(self, device_ids: Iterable[str] = ()):
+        super().__init__(_intern(device_id) for device_id in device_ids)
+        self._counts: Dict[str, int] = {}
+        for device_id in self:
+            self._counts[device_id] = self._counts.get(device_id, 0) + 1
+    
+    def _index_add(self, device_id: Any) -> None:
+        self._counts[device_id] = self._counts.get(device_id, 0) + 1
+    
+    def _index_discard(self, device_id: Any) -> None:
+        remaining = self._counts[device_id] - 1
+        if remaining:
+            self._counts[device_id] = remaining
+        else:
+            del self._counts[device_id]
+    
+    def _reindex(self) -> None:
+        self._counts = {}
+        for device_id in self:
+            self._index_add(device_id)
+    
+    def __contains__(self, device_id: Any) -> bool:
+        return device_id in self._counts
+    
+    def count(self, device_id: Any) -> int:
+        return self._counts.get(device_id, 0)
+    
+    def append(self, device_id: Any) -> None:
+        device_id = _intern(device_id)
+        super().append(device_id)
+        self._index_add(device_id)
+    
+    def extend(self, device_ids: Iterable[Any]) -> None:
+        for device_id in device_ids:
+            self.append(device_id)
+    
+    def __iadd__(self, device_ids: Iterable[Any]) -> "DeviceIdList":
+        self.extend(device_ids)
+        return self
+    
+    def insert(self, index: int, device_id: Any) -> None:
+        device_id = _intern(device_id)
+        super().insert(index, device_id)
+        self._index_add(device_id)
+    
+    def remove(self, device_id: Any) -> None:
+        super().remove(device_id)
+        self._index_discard(device_id)
+    
+    def pop(self, index: int = -1) -> Any:
+        device_id = super().pop(index)
+        self._index_discard(device_id)
+        return device_id
+    
+    def clear(self) -> None:
+        super().clear()
+        self._counts = {}
+    
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, slice):
+            super().__setitem__(index, [_intern(device_id) for device_id in value])
+        else:
+            super().__setitem__(index, _intern(value))
+        self._reindex()
+    
+    def __delitem__(self, index) -> None:
+        super().__delitem__(index)
+        self._reindex()
+    
+    def __imul__(self, n: int) -> "DeviceIdList":
+        super().__imul__(n)
+        self._reindex()
+        return self
+    
+    def __reduce__(self):
+        return (self.__class__, (list(self),))
+
+
 @dataclass
 class DeviceGroup:
     """
     Represents a group of Shelly devices.
+    
+    device_ids is always held as a DeviceIdList, including when it is reassigned.
+    _file_path caches where the group manager stores the group and is reset
+    whenever the group is renamed.
     """
     name: str
     description: Optional[str] = None
     device_ids: List[str] = field(default_factory=list)
     tags: List[str] = field(default_factory=list)
     config: Dict[str, Any] = field(default_factory=dict)
+    _file_path: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name == "device_ids" and not isinstance(value, DeviceIdList):
+            value = DeviceIdList(value)
+        elif name == "name":
+            super().__setattr__("_file_path", None)
+        super().__setattr__(name, value)
 
     def add_device(self, device_id: str) -> None:
         """
@@ -87,7 +192,7 @@ class DeviceGroup:
         """
         result = {
             "name": self.name,
-            "device_ids": self.device_ids,
+            "device_ids": list(self.device_ids),
         }
         
         if self.description:
@@ -106,6 +211,8 @@ class DeviceGroup:
         """
         Create a DeviceGroup from a dictionary.
         
+        Duplicate device IDs are dropped, keeping the first occurrence of each.
+        
         Args:
             data: Dictionary containing group data
             
@@ -115,7 +222,7 @@ class DeviceGroup:
         return cls(
             name=data["name"],
             description=data.get("description"),
-            device_ids=data.get("device_ids", []),
+            device_ids=list(dict.fromkeys(data.get("device_ids") or ())),
             tags=data.get("tags", []),
             config=data.get("config", {})
         ) 
\ No newline at end of file
@@ -19,8 +19,24 @@ class DeviceStatus(str, Enum):
     OFFLINE = "offline"
     ERROR = "error"
 
+# Serialized fields, in the order written by Device.to_dict()
+_DICT_FIELDS = (
+    "id", "name", "device_name", "device_type", "generation", "ip_address",
+    "mac_address", "firmware_version", "status", "discovery_method", "last_seen",
+    "hostname", "timezone", "location", "wifi_ssid", "cloud_enabled",
+    "cloud_connected", "mqtt_enabled", "mqtt_server", "num_outputs", "num_meters",
+    "max_power", "eco_mode_enabled", "model", "slot", "auth_enabled", "auth_domain",
+    "fw_id", "raw_type", "raw_model", "raw_app", "features", "has_update",
+    "restart_required",
+)
+
+# Shared by all devices without a matching configuration
+_EMPTY_FEATURES = ()
+
 class Device:
     """Represents a Shelly device"""
+    __slots__ = _DICT_FIELDS + ("config",)
+
     def __init__(
         self,
         id: str,
@@ -81,6 +97,12 @@ class Device:
         self.has_update = has_update  # Initialize new field
         self.restart_required = restart_required  # Track if device needs restart after config changes
         
+        # Unknown-generation devices never have a configuration; skip the lookup
+        if generation == DeviceGeneration.UNKNOWN:
+            self.config = None
+            self._apply_unknown_defaults()
+            return
+        
         # Get device configuration
         self.config = device_config_manager.get_device_config(
             raw_type=raw_type or "",
@@ -98,54 +120,28 @@ class Device:
             self.max_power = self.config.max_power
             self.features = self.config.features
         else:
-            self.device_name = "Unknown Device"
-            self.device_type = "unknown"
-            self.num_outputs = None
-            self.num_meters = None
-            self.max_power = None
-            self.features = []
+            self._apply_unknown_defaults()
+
+    def _apply_unknown_defaults(self) -> None:
+        """Set the device properties used when no configuration matches"""
+        self.device_name = "Unknown Device"
+        self.device_type = "unknown"
+        self.num_outputs = None
+        self.num_meters = None
+        self.max_power = None
+        self.features = _EMPTY_FEATURES
 
     def __str__(self) -> str:
         return f"{self.name or self.id} ({self.device_name})"
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert device to dictionary for serialization"""
-        return {
-            "id": self.id,
-            "name": self.name,
-            "device_name": self.device_name,
-            "device_type": self.device_type,
-            "generation": self.generation.value,
-            "ip_address": self.ip_address,
-            "mac_address": self.mac_address,
-            "firmware_version": self.firmware_version,
-            "status": self.status.value,
-            "discovery_method": self.discovery_method,
-            "last_seen": self.last_seen.isoformat(),
-            "hostname": self.hostname,
-            "timezone": self.timezone,
-            "location": self.location,
-            "wifi_ssid": self.wifi_ssid,
-            "cloud_enabled": self.cloud_enabled,
-            "cloud_connected": self.cloud_connected,
-            "mqtt_enabled": self.mqtt_enabled,
-            "mqtt_server": self.mqtt_server,
-            "num_outputs": self.num_outputs,
-            "num_meters": self.num_meters,
-            "max_power": self.max_power,
-            "eco_mode_enabled": self.eco_mode_enabled,
-            "model": self.model,
-            "slot": self.slot,
-            "auth_enabled": self.auth_enabled,
-            "auth_domain": self.auth_domain,
-            "fw_id": self.fw_id,
-            "raw_type": self.raw_type,
-            "raw_model": self.raw_model,
-            "raw_app": self.raw_app,
-            "features": self.features,
-            "has_update": self.has_update,
-            "restart_required": self.restart_required
-        }
+        data = {field: getattr(self, field) for field in _DICT_FIELDS}
+        data["generation"] = self.generation.value
+        data["status"] = self.status.value
+        data["last_seen"] = self.last_seen.isoformat()
+        data["features"] = list(self.features)
+        return data
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "Device":
@@ -173,7 +169,7 @@ class Device:
 
     def to_schema(self) -> "DeviceSchema":
         """Convert to DeviceSchema for API responses"""
-        from src.shelly_manager.models.device_schema import DeviceSchema
+        from .device_schema import DeviceSchema
         
         return DeviceSchema(
             id=self.id,
@@ -207,7 +203,7 @@ class Device:
             raw_type=self.raw_type,
             raw_model=self.raw_model,
             raw_app=self.raw_app,
-            features=self.features,
+            features=list(self.features),
             has_update=self.has_update,
             restart_required=self.restart_required
         ) 
\ No newline at end of file
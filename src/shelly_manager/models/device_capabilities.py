@@ -7,6 +7,7 @@ which APIs, parameters, and settings are available for each device model.
 """
 from typing import Dict, List, Any, Optional, Set
 import os
+import re
 import yaml
 import json
 import logging
@@ -15,12 +16,39 @@ import aiohttp
 import asyncio
 
 from ..utils.logging import get_logger
+from ..utils.json_utils import json_loads
 from .device import Device, DeviceGeneration
 from .parameter_mapping import ParameterMapper
 
 # Get logger for this module
 logger = get_logger(__name__)
 
+# Parameter type names for the exact types JSON decoding produces
+_JSON_TYPE_NAMES = {
+    str: "string",
+    bool: "boolean",
+    int: "integer",
+    float: "float",
+    dict: "object",
+    list: "array",
+    type(None): "null",
+}
+
+# Path parts containing any of these are typically status/reporting values
+_READ_ONLY_INDICATORS = re.compile("|".join(map(re.escape, [
+    "uptime", "timestamp", "ram", "fs", "has_update",
+    "current", "voltage", "power", "temperature", "humidity",
+    "energy", "total", "id", "mac", "serial", "fw_version",
+    "time", "unixtime", "overtemperature", "ttot"
+])))
+
+# Path parts naming config/settings fields that are never writable
+_NEVER_WRITABLE_SETTINGS = frozenset([
+    "fw", "cloud_enabled", "discovering", "debug_enable", "device_type",
+    "build_id", "factory_reset", "uptime", "ram_free", "ram_total",
+    "ram_size", "fs_free", "fs_size", "available_updates"
+])
+
 class DeviceCapability:
     """
     Represents the capabilities of a specific device type.
@@ -162,7 +190,11 @@ class DeviceCapability:
     def to_dict(self) -> Dict[str, Any]:
         """
         Convert capability to dictionary.
-        
+
+        The nested ``apis``, ``parameters`` and ``type_mappings`` structures are
+        shared with the capability rather than copied, so callers must treat the
+        result as read-only.
+
         Returns:
             Dictionary representation of capability
         """
@@ -339,7 +371,8 @@ class DeviceCapabilities:
             # Make sure the directory exists
             os.makedirs(self.capabilities_dir, exist_ok=True)
             
-            # Convert capability to dictionary
+            # Convert capability to dictionary (a shallow view, dumped as-is
+            # without a read-back verification pass)
             capability_data = capability.to_dict()
             
             # Create filename
@@ -513,7 +546,7 @@ class CapabilityDiscovery:
                     url = f"http://{device.ip_address}{endpoint}"
                     async with session.get(url) as response:
                         if response.status == 200:
-                            data = await response.json()
+                            data = await response.json(loads=json_loads)
                             
                             # Store the endpoint and its response structure
                             api_name = endpoint.lstrip('/')
@@ -541,7 +574,11 @@ class CapabilityDiscovery:
     def _extract_parameters_recursive(self, data: Dict[str, Any], parameters: Dict[str, Any], 
                                      api_name: str, path_prefix: str, path_parts: List[str]) -> None:
         """
-        Recursively extract parameters from nested JSON data.
+        Extract parameters from nested JSON data.
+        
+        Nested objects are walked depth-first with an explicit stack rather than
+        recursive calls, so parameters are registered in the same order and deep
+        data cannot hit the recursion limit.
         
         Args:
             data: JSON data to extract parameters from
@@ -553,46 +590,68 @@ class CapabilityDiscovery:
         if not isinstance(data, dict):
             return
             
-        for key, value in data.items():
-            current_path = path_prefix + ("." if path_prefix else "") + key
-            current_parts = path_parts + [key]
-            
-            # Skip only internal fields that start with underscores
-            # Don't skip wifi_sta and other fields as they may contain important parameters
-            if key.startswith("_"):
-                continue
+        infer_parameter_type = self._infer_parameter_type
+        # Path parts of the item being processed; each object on the stack owns the
+        # first `depth` of them, so they are extended and truncated instead of copied
+        current_parts = list(path_parts)
+        # Each entry is an object still being walked:
+        # (remaining items, path prefix, parameter name prefix, depth)
+        stack = [(iter(data.items()), path_prefix, path_prefix.replace(".", "_"), len(current_parts))]
+        while stack:
+            items, path_prefix, name_prefix, depth = stack[-1]
+            for key, value in items:
+                # Skip only internal fields that start with underscores
+                # Don't skip wifi_sta and other fields as they may contain important parameters
+                if key[:1] == "_":
+                    continue
                 
-            # Determine parameter type
-            param_type = self._infer_parameter_type(value)
-            
-            # For any value (not just non-objects), register as potential parameter
-            # Create parameter entry if it doesn't exist
-            param_name = current_path.replace(".", "_")  # Use underscores for dots in parameter names
-            
-            # Check if parameter already exists
-            if param_name not in parameters:
-                # Determine if this parameter is likely writable
-                is_read_only = self._is_likely_read_only(current_parts, param_type)
+                del current_parts[depth:]
+                current_parts.append(key)
+                
+                # Parameter names use underscores for the dots in paths; extend the
+                # parent's name rather than rewriting the whole path
+                if path_prefix:
+                    current_path = path_prefix + "." + key
+                    param_name = name_prefix + "_" + key.replace(".", "_")
+                else:
+                    current_path = key
+                    param_name = key.replace(".", "_")
+                    
+                # Determine parameter type
+                param_type = infer_parameter_type(value)
                 
-                # For settings APIs, many parameters are writable unless explicitly marked as read-only
-                if "settings" in api_name and not is_read_only:
-                    is_read_only = False
+                # For any value (not just non-objects), register as potential parameter
+                # Create parameter entry if it doesn't exist
+                if param_name not in parameters:
+                    # Determine if this parameter is likely writable
+                    is_read_only = self._is_likely_read_only(current_parts, param_type)
+                    
+                    # For settings APIs, many parameters are writable unless explicitly marked as read-only
+                    if "settings" in api_name and not is_read_only:
+                        is_read_only = False
+                    
+                    parameters[param_name] = {
+                        "type": param_type,
+                        "description": f"Parameter {current_path}",
+                        "api": api_name,
+                        "parameter_path": current_path,
+                        "read_only": is_read_only
+                    }
                 
-                parameters[param_name] = {
-                    "type": param_type,
-                    "description": f"Parameter {current_path}",
-                    "api": api_name,
-                    "parameter_path": current_path,
-                    "read_only": is_read_only
-                }
-            
-            # For objects, recurse to extract nested parameters
-            if isinstance(value, dict):
-                self._extract_parameters_recursive(value, parameters, api_name, current_path, current_parts)
-            # For arrays, only extract if they contain objects
-            elif isinstance(value, list) and value and isinstance(value[0], dict):
-                # For the first item in the array as an example
-                self._extract_parameters_recursive(value[0], parameters, api_name, current_path + "[0]", current_parts + ["[0]"])
+                # For objects, descend into the nested parameters before the next sibling
+                if isinstance(value, dict):
+                    stack.append((iter(value.items()), current_path, param_name, len(current_parts)))
+                    break
+                # For arrays, only extract if they contain objects
+                elif isinstance(value, list) and value and isinstance(value[0], dict):
+                    # For the first item in the array as an example
+                    current_parts.append("[0]")
+                    stack.append((iter(value[0].items()), current_path + "[0]", param_name + "[0]",
+                                  len(current_parts)))
+                    break
+            else:
+                # All items of this object are done
+                stack.pop()
     
     def _infer_parameter_type(self, value: Any) -> str:
         """
@@ -604,6 +663,12 @@ class CapabilityDiscovery:
         Returns:
             String representing the parameter type
         """
+        # Decoded JSON only holds these exact types, so one lookup settles almost every value
+        type_name = _JSON_TYPE_NAMES.get(type(value))
+        if type_name is not None:
+            return type_name
+        
+        # Subclasses (e.g. IntEnum or OrderedDict) go through the isinstance checks
         if value is None:
             return "null"
         elif isinstance(value, bool):
@@ -637,26 +702,13 @@ class CapabilityDiscovery:
         if "status" in path_parts:
             return True
             
-        # More precise read-only indicators - these are typically status/reporting values
-        read_only_indicators = [
-            "uptime", "timestamp", "ram", "fs", "has_update", 
-            "current", "voltage", "power", "temperature", "humidity", 
-            "energy", "total", "id", "mac", "serial", "fw_version",
-            "time", "unixtime", "temperature", "overtemperature", "ttot"
-        ]
-        
-        # Check if any path part contains a read-only indicator
-        if any(any(indicator in part.lower() for indicator in read_only_indicators) for part in path_parts):
+        # Check if any path part contains a read-only indicator (see _READ_ONLY_INDICATORS)
+        search_indicator = _READ_ONLY_INDICATORS.search
+        if any(search_indicator(part.lower()) for part in path_parts):
             return True
             
         # Some parameters in config/settings are never writable
-        never_writable_settings = [
-            "fw", "cloud_enabled", "discovering", "debug_enable", "device_type",
-            "build_id", "factory_reset", "uptime", "ram_free", "ram_total", 
-            "ram_size", "fs_free", "fs_size", "available_updates"
-        ]
-        
-        if any(part in never_writable_settings for part in path_parts):
+        if any(part in _NEVER_WRITABLE_SETTINGS for part in path_parts):
             return True
             
         # Arrays are typically for status reporting, but we can inspect their content if needed
@@ -707,7 +759,7 @@ class CapabilityDiscovery:
                     url = f"http://{device.ip_address}/rpc/{method}"
                     async with session.post(url, json={}) as response:
                         if response.status == 200:
-                            data = await response.json()
+                            data = await response.json(loads=json_loads)
                             
                             # Store the method and its response structure
                             apis[method] = {
@@ -800,7 +852,7 @@ class CapabilityDiscovery:
             url = f"http://{device.ip_address}/rpc/Sys.GetConfig"
             async with session.post(url, json={}) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = await response.json(loads=json_loads)
                     
                     if "device" in data and "eco_mode" in data["device"]:
                         parameters["eco_mode"] = {
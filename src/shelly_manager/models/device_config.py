@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 import yaml
 from pathlib import Path
@@ -13,11 +13,11 @@ class DeviceTypeConfig:
     num_outputs: int
     num_meters: int
     max_power: Optional[int] = None
-    features: List[str] = None
+    features: Tuple[str, ...] = ()
     
     def __post_init__(self):
-        if self.features is None:
-            self.features = []
+        # Immutable, so every Device of this type can share it
+        self.features = tuple(self.features) if self.features else ()
 
 class DeviceConfigManager:
     """Manages device configurations from YAML"""
@@ -28,7 +28,10 @@ class DeviceConfigManager:
         self.gen2_devices: Dict[str, DeviceTypeConfig] = {}
         self.gen3_devices: Dict[str, DeviceTypeConfig] = {}
         self.gen4_devices: Dict[str, DeviceTypeConfig] = {}
+        # (generation, DEVICE_ID upper-cased) -> config, for exact-match lookups
+        self._by_key: Dict[Tuple[str, str], DeviceTypeConfig] = {}
         self._load_config()
+        self._build_index()
     
     def _load_config(self):
         """Load device configurations from YAML file"""
@@ -88,6 +91,14 @@ class DeviceConfigManager:
         except Exception as e:
             raise RuntimeError(f"Failed to load device configurations: {str(e)}")
     
+    def _build_index(self):
+        """Index all device configurations by generation and case-folded device ID"""
+        for generation, devices in (("gen1", self.gen1_devices), ("gen2", self.gen2_devices),
+                                    ("gen3", self.gen3_devices), ("gen4", self.gen4_devices)):
+            for device_id, config in devices.items():
+                # First entry wins, matching the order of the linear scans
+                self._by_key.setdefault((generation, device_id.upper()), config)
+    
     def get_device_config(self, raw_type: str, raw_app: str, generation: str, raw_model: str = None) -> Optional[DeviceTypeConfig]:
         """Get device configuration based on raw model, type, and app"""
         logger = get_logger(__name__)
@@ -109,13 +120,18 @@ class DeviceConfigManager:
         
         # Try direct model match first (most reliable)
         if raw_model:
-            for device_id, config in devices.items():
-                if device_id.upper() == raw_model:
-                    logger.debug(f"Matched device by model: {device_id}")
-                    return config
+            config = self._by_key.get((generation, raw_model))
+            if config is not None:
+                logger.debug(f"Matched device by model: {raw_model}")
+                return config
             
         # For Gen1, try matching by raw_type (backward compatibility)
         if generation == "gen1" and raw_type:
+            config = self._by_key.get((generation, raw_type))
+            if config is not None:
+                logger.debug(f"Matched Gen1 device by type: {raw_type}")
+                return config
+            
             for device_id, config in devices.items():
                 if device_id.upper() in raw_type:
                     logger.debug(f"Matched Gen1 device by type: {device_id}")
@@ -124,10 +140,10 @@ class DeviceConfigManager:
         # As last resort, try matching by app
         if raw_app:
             # Try exact match
-            for device_id, config in devices.items():
-                if device_id.lower() == raw_app:
-                    logger.debug(f"Matched device by app: {device_id}")
-                    return config
+            config = self._by_key.get((generation, raw_app.upper()))
+            if config is not None:
+                logger.debug(f"Matched device by app: {raw_app}")
+                return config
             
             # Try partial match
             for device_id, config in devices.items():
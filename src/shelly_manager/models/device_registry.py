@@ -2,17 +2,115 @@
 Device registry for managing device objects and loading from files.
 """
 from typing import Dict, Optional, List
+import asyncio
+import copy
+import functools
 import os
 import yaml
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import logging
 
 from ..utils.logging import get_logger
 from .device import Device, DeviceGeneration
 
+# Prefer the libyaml-backed loader/dumper when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _Loader, CSafeDumper as _Dumper
+except ImportError:
+    from yaml import SafeLoader as _Loader, SafeDumper as _Dumper
+
+# Optional msgpack sidecar cache next to each device YAML, enabled per registry (YAML stays authoritative)
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+SIDECAR_SUFFIX = ".mp"
+
 # Get logger for this module
 logger = get_logger(__name__)
 
+
+@functools.lru_cache(maxsize=4096)
+def _load_yaml_cached(path: str, mtime_ns: int, size: int):
+    """
+    Parse a YAML file, memoized on its path, modification time and size.
+    
+    The key does not catch a same-size rewrite within one tick of a coarse
+    filesystem clock, since device files are rewritten in place. save_device
+    therefore clears the cache after every write. Callers must not mutate the
+    result; use _load_yaml instead.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.load(f, Loader=_Loader)
+
+
+def _load_yaml(path, use_sidecar: bool = False) -> Optional[Dict]:
+    """
+    Load a device YAML file through the parse cache.
+    
+    With use_sidecar, a msgpack sidecar written for exactly this version of the
+    YAML file (same modification time and size) is decoded instead.
+    
+    Args:
+        path: Path of the YAML file
+        use_sidecar: Whether to consult the msgpack sidecar; requires msgspec
+        
+    Returns:
+        A private copy of the parsed data
+    """
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    
+    if use_sidecar and msgspec is not None:
+        try:
+            with open(os.path.splitext(path)[0] + SIDECAR_SUFFIX, 'rb') as f:
+                cached = msgspec.msgpack.decode(f.read())
+            # Any other source stamp means the YAML was rewritten, edited or restored since
+            if cached["source"] == [st.st_mtime_ns, st.st_size]:
+                return cached["data"]
+        except (OSError, msgspec.DecodeError, KeyError, TypeError):
+            pass
+    
+    return copy.deepcopy(_load_yaml_cached(path, st.st_mtime_ns, st.st_size))
+
+
+def _write_sidecar(yaml_path: Path, device_data: Dict) -> None:
+    """
+    Write the msgpack sidecar for a device file.
+    
+    Must be called after the YAML file is written: the sidecar records the YAML
+    file's modification time and size and is only used while both still match.
+    
+    Args:
+        yaml_path: Path of the device YAML file
+        device_data: Serialized device data that was written to it
+    """
+    try:
+        st = os.stat(yaml_path)
+        payload = msgspec.msgpack.encode({"source": [st.st_mtime_ns, st.st_size], "data": device_data})
+        with open(yaml_path.with_suffix(SIDECAR_SUFFIX), 'wb') as f:
+            f.write(payload)
+    except OSError as e:
+        logger.debug(f"Could not write sidecar cache for {yaml_path}: {e}")
+
+
+def _discard_sidecar(yaml_path: Path) -> None:
+    """
+    Remove a device file's msgpack sidecar, if there is one.
+    
+    Args:
+        yaml_path: Path of the device YAML file
+    """
+    try:
+        os.remove(yaml_path.with_suffix(SIDECAR_SUFFIX))
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.debug(f"Could not remove sidecar cache for {yaml_path}: {e}")
+
+
 class DeviceRegistry:
     """
     Registry for Shelly devices.
@@ -21,14 +119,21 @@ class DeviceRegistry:
     to load devices from files when requested.
     """
     
-    def __init__(self, devices_dir: str = "data/devices"):
+    def __init__(self, devices_dir: str = "data/devices", use_sidecar: bool = False):
         """
         Initialize the device registry.
         
         Args:
             devices_dir: Directory where device YAML files are stored
+            use_sidecar: Keep a msgpack copy (<name>.mp) next to each saved device file
+                         and read it instead of the YAML while the YAML is unchanged.
+                         Requires msgspec; ignored with a warning if it is not installed.
         """
         self.devices_dir = Path(devices_dir)
+        if use_sidecar and msgspec is None:
+            logger.warning("msgspec is not installed; device sidecar caches are disabled")
+            use_sidecar = False
+        self.use_sidecar = use_sidecar
         self.devices: Dict[str, Device] = {}
         logger.debug(f"Initialized DeviceRegistry with directory: {self.devices_dir}")
     
@@ -65,9 +170,40 @@ class DeviceRegistry:
         Returns:
             List of found devices (may be shorter than input list if some devices aren't found)
         """
+        # Fast path: serve everything already cached without touching the disk
+        missing = [device_id for device_id in device_ids if device_id not in self.devices]
+        
+        if missing:
+            # List the directory once and resolve all misses against that listing
+            file_paths = list(self.devices_dir.glob("*.yaml")) if self.devices_dir.exists() else None
+            for device_id in missing:
+                device = self._load_device_from_file(device_id, file_paths)
+                if device:
+                    self.devices[device_id] = device
+                else:
+                    logger.warning(f"Device not found: {device_id}")
+        
+        return [self.devices[device_id] for device_id in device_ids if device_id in self.devices]
+    
+    async def get_devices_async(self, device_ids: List[str]) -> List[Device]:
+        """
+        Get multiple devices by their IDs without blocking the event loop.
+        
+        Cache misses are loaded from file in the default executor, concurrently.
+        
+        Args:
+            device_ids: List of device IDs to get
+            
+        Returns:
+            List of found devices, in input order (may be shorter than input list)
+        """
+        loop = asyncio.get_running_loop()
+        devices = await asyncio.gather(
+            *(loop.run_in_executor(None, self.get_device, device_id) for device_id in device_ids)
+        )
+        
         result = []
-        for device_id in device_ids:
-            device = self.get_device(device_id)
+        for device_id, device in zip(device_ids, devices):
             if device:
                 result.append(device)
             else:
@@ -119,8 +255,17 @@ class DeviceRegistry:
             filepath = self.devices_dir / filename
             
             # Save to file
-            with open(filepath, 'w') as f:
-                yaml.dump(device_data, f, default_flow_style=False)
+            # Keep to_dict() key order and write non-ASCII text as-is
+            with open(filepath, 'w', encoding='utf-8') as f:
+                yaml.dump(device_data, f, Dumper=_Dumper, default_flow_style=False,
+                          sort_keys=False, allow_unicode=True, width=1000)
+            # The rewrite may not change the file's (mtime, size) key; drop any cached parse
+            _load_yaml_cached.cache_clear()
+            if self.use_sidecar:
+                _write_sidecar(filepath, device_data)
+            else:
+                # Don't leave a stale copy from a registry that had sidecars enabled
+                _discard_sidecar(filepath)
             
             # Update registry
             self.devices[device.id] = device
@@ -132,12 +277,73 @@ class DeviceRegistry:
             logger.error(f"Failed to save device {device.id}: {e}")
             return False
     
-    def _load_device_from_file(self, device_id: str) -> Optional[Device]:
+    def _device_from_data(self, device_data: Dict, file_path) -> Optional[Device]:
+        """
+        Build a device from the parsed contents of its YAML file.
+        
+        Args:
+            device_data: Parsed, non-empty device file contents
+            file_path: Path of the file the data came from, for log messages
+            
+        Returns:
+            The device, or None if the data has no ID and no MAC address to derive one from
+        """
+        # Clean up the data to match Device constructor parameters
+        # The existing files might have fields that aren't in the Device constructor
+        
+        # Make a clean copy without unwanted fields
+        clean_data = {}
+        
+        # Map field names that need conversion
+        # Some fields might be named differently in the file vs. the Device class
+        field_mapping = {
+            # Add mappings if needed for field name differences
+            "device_name": "name"  # example mapping
+        }
+        
+        # Known fields in Device.__init__
+        device_fields = [
+            "id", "name", "generation", "ip_address", "mac_address", 
+            "firmware_version", "status", "discovery_method", "hostname",
+            "timezone", "location", "wifi_ssid", "cloud_enabled", 
+            "cloud_connected", "mqtt_enabled", "mqtt_server", 
+            "eco_mode_enabled", "model", "slot", "auth_enabled", 
+            "auth_domain", "fw_id", "raw_type", "raw_model", "raw_app", 
+            "last_seen", "has_update"
+        ]
+        
+        # Copy only valid fields to clean_data
+        for field in device_fields:
+            mapped_field = field_mapping.get(field, field)
+            if mapped_field in device_data:
+                clean_data[field] = device_data[mapped_field]
+        
+        # Ensure required fields exist
+        if "id" not in clean_data and "mac_address" in clean_data:
+            # Generate an ID from MAC if missing
+            mac = clean_data["mac_address"].replace(":", "").lower()
+            if device_data.get("generation") == "gen1":
+                clean_data["id"] = mac
+            else:
+                prefix = "shelly"
+                if "raw_app" in clean_data and clean_data["raw_app"]:
+                    prefix = clean_data["raw_app"].lower()
+                clean_data["id"] = f"{prefix}-{mac}"
+        
+        if "id" not in clean_data:
+            logger.warning(f"Invalid device data (missing ID) in file: {file_path}")
+            return None
+        
+        # Convert the data to a Device object
+        return Device.from_dict(clean_data)
+    
+    def _load_device_from_file(self, device_id: str, file_paths: Optional[List[Path]] = None) -> Optional[Device]:
         """
         Load a device from its file.
         
         Args:
             device_id: ID of the device to load
+            file_paths: YAML files in the devices directory, if already listed
             
         Returns:
             Device object if found, None otherwise
@@ -150,11 +356,14 @@ class DeviceRegistry:
             logger.warning(f"Devices directory {self.devices_dir} does not exist")
             return None
         
+        if file_paths is None:
+            file_paths = list(self.devices_dir.glob("*.yaml"))
+        
         # Look for files matching the device ID
         device_file = None
         
         # First try to find by exact MAC address match
-        for file_path in self.devices_dir.glob("*_*.yaml"):
+        for file_path in file_paths:
             # Extract the MAC part from the filename pattern <type>_<mac>.yaml
             file_name = file_path.name
             if "_" in file_name:
@@ -166,7 +375,7 @@ class DeviceRegistry:
         
         if not device_file:
             # Try looking for files containing the MAC address
-            for file_path in self.devices_dir.glob("*.yaml"):
+            for file_path in file_paths:
                 if mac_address in file_path.name.upper():
                     device_file = file_path
                     break
@@ -179,54 +388,10 @@ class DeviceRegistry:
         
         try:
             # Load device data from YAML file
-            with open(device_file, 'r') as f:
-                device_data = yaml.safe_load(f)
+            device_data = _load_yaml(device_file, self.use_sidecar)
             
             if device_data:
-                # Clean up the data to match Device constructor parameters
-                # The existing files might have fields that aren't in the Device constructor
-                
-                # Make a clean copy without unwanted fields
-                clean_data = {}
-                
-                # Map field names that need conversion
-                # Some fields might be named differently in the file vs. the Device class
-                field_mapping = {
-                    # Add mappings if needed for field name differences
-                    "device_name": "name"  # example mapping
-                }
-                
-                # Known fields in Device.__init__
-                device_fields = [
-                    "id", "name", "generation", "ip_address", "mac_address", 
-                    "firmware_version", "status", "discovery_method", "hostname",
-                    "timezone", "location", "wifi_ssid", "cloud_enabled", 
-                    "cloud_connected", "mqtt_enabled", "mqtt_server", 
-                    "eco_mode_enabled", "model", "slot", "auth_enabled", 
-                    "auth_domain", "fw_id", "raw_type", "raw_model", "raw_app", 
-                    "last_seen", "has_update"
-                ]
-                
-                # Copy only valid fields to clean_data
-                for field in device_fields:
-                    mapped_field = field_mapping.get(field, field)
-                    if mapped_field in device_data:
-                        clean_data[field] = device_data[mapped_field]
-                
-                # Ensure required fields exist
-                if "id" not in clean_data and "mac_address" in clean_data:
-                    # Generate an ID from MAC if missing
-                    mac = clean_data["mac_address"].replace(":", "").lower()
-                    if device_data.get("generation") == "gen1":
-                        clean_data["id"] = mac
-                    else:
-                        prefix = "shelly"
-                        if "raw_app" in clean_data and clean_data["raw_app"]:
-                            prefix = clean_data["raw_app"].lower()
-                        clean_data["id"] = f"{prefix}-{mac}"
-                
-                # Convert the data to a Device object
-                return Device.from_dict(clean_data)
+                return self._device_from_data(device_data, device_file)
             else:
                 logger.warning(f"Empty device data in file: {device_file}")
                 return None
@@ -248,76 +413,56 @@ class DeviceRegistry:
             logger.warning(f"Devices directory {self.devices_dir} does not exist")
             return []
         
+        # Collect YAML files with a single directory scan
+        with os.scandir(self.devices_dir) as entries:
+            paths = [entry.path for entry in entries
+                     if entry.name.endswith(".yaml") and entry.is_file()]
+        
         loaded_devices = []
+        if not paths:
+            logger.info(f"Loaded 0 devices from {self.devices_dir}")
+            return loaded_devices
         
-        # Process all YAML files in the directory
-        for file_path in self.devices_dir.glob("*.yaml"):
-            try:
-                with open(file_path, 'r') as f:
-                    device_data = yaml.safe_load(f)
-                
-                if device_data:
-                    # Clean up the data to match Device constructor parameters
-                    # The existing files might have fields that aren't in the Device constructor
-                    
-                    # Make a clean copy without unwanted fields
-                    clean_data = {}
-                    
-                    # Map field names that need conversion
-                    # Some fields might be named differently in the file vs. the Device class
-                    field_mapping = {
-                        # Add mappings if needed for field name differences
-                        "device_name": "name"  # example mapping
-                    }
-                    
-                    # Known fields in Device.__init__
-                    device_fields = [
-                        "id", "name", "generation", "ip_address", "mac_address", 
-                        "firmware_version", "status", "discovery_method", "hostname",
-                        "timezone", "location", "wifi_ssid", "cloud_enabled", 
-                        "cloud_connected", "mqtt_enabled", "mqtt_server", 
-                        "eco_mode_enabled", "model", "slot", "auth_enabled", 
-                        "auth_domain", "fw_id", "raw_type", "raw_model", "raw_app", 
-                        "last_seen", "has_update"
-                    ]
-                    
-                    # Copy only valid fields to clean_data
-                    for field in device_fields:
-                        mapped_field = field_mapping.get(field, field)
-                        if mapped_field in device_data:
-                            clean_data[field] = device_data[mapped_field]
-                    
-                    # Ensure required fields exist
-                    if "id" not in clean_data and "mac_address" in clean_data:
-                        # Generate an ID from MAC if missing
-                        mac = clean_data["mac_address"].replace(":", "").lower()
-                        if device_data.get("generation") == "gen1":
-                            clean_data["id"] = mac
-                        else:
-                            prefix = "shelly"
-                            if "raw_app" in clean_data and clean_data["raw_app"]:
-                                prefix = clean_data["raw_app"].lower()
-                            clean_data["id"] = f"{prefix}-{mac}"
-                            
-                    if "id" in clean_data:
-                        # Create Device object
-                        device = Device.from_dict(clean_data)
-                        self.devices[device.id] = device
-                        loaded_devices.append(device)
-                        logger.debug(f"Loaded device {device.id} from {file_path}")
-                    else:
-                        logger.warning(f"Invalid device data (missing ID) in file: {file_path}")
-                else:
-                    logger.warning(f"Invalid device data in file: {file_path}")
-            
-            except Exception as e:
-                logger.error(f"Failed to load device from {file_path}: {e}")
-                import traceback
-                logger.debug(traceback.format_exc())
+        # Read and parse the files concurrently, then register the devices in scan order
+        with ThreadPoolExecutor(max_workers=min(32, len(paths))) as executor:
+            devices = list(executor.map(self._load_device_file, paths))
+        
+        for file_path, device in zip(paths, devices):
+            if device is not None:
+                self.devices[device.id] = device
+                loaded_devices.append(device)
+                logger.debug(f"Loaded device {device.id} from {file_path}")
         
         logger.info(f"Loaded {len(loaded_devices)} devices from {self.devices_dir}")
         return loaded_devices
 
+    def _load_device_file(self, file_path: str) -> Optional[Device]:
+        """
+        Build a device from a single device YAML file.
+        
+        Safe to call from worker threads: it does not touch the registry.
+        
+        Args:
+            file_path: Path of the YAML file to load
+            
+        Returns:
+            The device, or None if the file is empty, invalid or has no ID
+        """
+        try:
+            device_data = _load_yaml(file_path, self.use_sidecar)
+            
+            if device_data:
+                return self._device_from_data(device_data, file_path)
+            else:
+                logger.warning(f"Invalid device data in file: {file_path}")
+        
+        except Exception as e:
+            logger.error(f"Failed to load device from {file_path}: {e}")
+            import traceback
+            logger.debug(traceback.format_exc())
+        
+        return None
+
     def get_device_by_ip(self, ip_address: str) -> Optional[Device]:
         """
         Find a device by IP address.
@@ -1,6 +1,7 @@
 """Parameter mapping between different device generations."""
 
 import os
+import sys
 import yaml
 from typing import Dict, List, Any, Optional, Set
 from pathlib import Path
@@ -170,8 +171,13 @@ class ParameterManager:
             
             # Load Gen1 to standard mappings
             if "gen1_to_standard" in data:
-                self.gen1_to_standard = data["gen1_to_standard"]
-                # Create reverse mapping
+                # Intern the names: they are looked up for every parameter of
+                # every device during bulk operations
+                self.gen1_to_standard = {
+                    sys.intern(str(k)): sys.intern(str(v))
+                    for k, v in data["gen1_to_standard"].items()
+                }
+                # Create reverse mapping (shares the interned strings)
                 self.standard_to_gen1 = {v: k for k, v in self.gen1_to_standard.items()}
             
             logger.info(f"Loaded {len(self.parameter_definitions)} parameter definitions from configuration")
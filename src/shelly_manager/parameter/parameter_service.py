@@ -15,6 +15,7 @@ import urllib.parse
 from pathlib import Path
 
 from ..utils.logging import get_logger
+from ..utils.json_utils import json_loads
 from ..models.device import Device, DeviceGeneration
 from ..models.device_capabilities import device_capabilities, DeviceCapability
 from ..models.device_registry import device_registry
@@ -246,7 +247,7 @@ class ParameterService:
             url = f"http://{device.ip_address}/settings"
             async with self.session.get(url, timeout=5) as response:
                 if response.status == 200:
-                    settings = await response.json()
+                    settings = await response.json(loads=json_loads)
                     
                     # Process each setting
                     for key, value in settings.items():
@@ -265,7 +266,7 @@ class ParameterService:
             url = f"http://{device.ip_address}/status"
             async with self.session.get(url, timeout=5) as response:
                 if response.status == 200:
-                    status = await response.json()
+                    status = await response.json(loads=json_loads)
                     
                     # Process each status field
                     for key, value in status.items():
@@ -284,7 +285,7 @@ class ParameterService:
             url = f"http://{device.ip_address}/shelly"
             async with self.session.get(url, timeout=5) as response:
                 if response.status == 200:
-                    info = await response.json()
+                    info = await response.json(loads=json_loads)
                     
                     # Process each info field
                     for key, value in info.items():
@@ -319,7 +320,7 @@ class ParameterService:
                 
                 async with self.session.post(url, json=payload, timeout=5) as response:
                     if response.status == 200:
-                        data = await response.json()
+                        data = await response.json(loads=json_loads)
                         if "result" in data:
                             # Flatten the result structure
                             self._flatten_json(data["result"], "", result, method)
@@ -451,7 +452,7 @@ class ParameterService:
             try:
                 async with self.session.get(url, timeout=5) as response:
                     if response.status == 200:
-                        data = await response.json()
+                        data = await response.json(loads=json_loads)
                         # Parameter could be at the root or nested
                         parameter_parts = parameter_name.split('.')
                         value = data
@@ -481,7 +482,7 @@ class ParameterService:
         try:
             async with self.session.get(url, timeout=5) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = await response.json(loads=json_loads)
                     if parameter_name in data:
                         return True, data[parameter_name]
         except Exception:
@@ -492,7 +493,7 @@ class ParameterService:
         try:
             async with self.session.get(url, timeout=5) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = await response.json(loads=json_loads)
                     if parameter_name in data:
                         return True, data[parameter_name]
                         
@@ -558,7 +559,7 @@ class ParameterService:
             try:
                 async with self.session.post(url, json=payload, timeout=5) as response:
                     if response.status == 200:
-                        data = await response.json()
+                        data = await response.json(loads=json_loads)
                         if "result" in data:
                             result = data["result"]
                             
@@ -605,7 +606,7 @@ class ParameterService:
         try:
             async with self.session.post(url, json=payload, timeout=5) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = await response.json(loads=json_loads)
                     if "result" in data:
                         # For nested parameters like switch.0.name
                         parts = parameter_name.split('.')
@@ -639,7 +640,7 @@ class ParameterService:
         try:
             async with self.session.post(url, json=payload, timeout=5) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = await response.json(loads=json_loads)
                     if "result" in data:
                         # For nested parameters like switch.0.output
                         parts = parameter_name.split('.')
@@ -763,7 +764,7 @@ class ParameterService:
                     params = {"turn": "on" if value else "off"}
                     async with self.session.get(url, params=params, timeout=5) as response:
                         if response.status == 200:
-                            data = await response.json()
+                            data = await response.json(loads=json_loads)
                             return True, data
                         else:
                             logger.error(f"Error setting switch parameter: HTTP {response.status}")
@@ -776,7 +777,7 @@ class ParameterService:
             logger.debug(f"Setting Gen1 parameter {gen1_parameter_name} = {formatted_value} for device {device.id}")
             async with self.session.get(url, params=params, timeout=5) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = await response.json(loads=json_loads)
                     return True, data
                 else:
                     logger.error(f"Error setting parameter: HTTP {response.status}")
@@ -855,7 +856,7 @@ class ParameterService:
                 
                 async with self.session.post(url, json=payload, timeout=5) as response:
                     if response.status == 200:
-                        data = await response.json()
+                        data = await response.json(loads=json_loads)
                         return True, data
                     else:
                         logger.error(f"Error setting switch parameter: HTTP {response.status}")
@@ -904,7 +905,7 @@ class ParameterService:
         try:
             async with self.session.post(url, json=payload, timeout=5) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = await response.json(loads=json_loads)
                     if "error" in data:
                         logger.error(f"Error in RPC response: {data['error']}")
                         return False, data
@@ -989,7 +990,7 @@ class ParameterService:
                 async with self.session.post(url, json=data) as response:
                     if response.status == 200:
                         try:
-                            result = await response.json()
+                            result = await response.json(loads=json_loads)
                             # Check if there's an error in the response
                             if "error" in result:
                                 logger.warning(f"Error restarting device {device.id}: {result['error']}")
@@ -0,0 +1,37 @@
+"""
+JSON helpers for the Shelly Manager.
+
+Device responses and test fixtures are decoded with orjson when it is
+installed, and with the json module otherwise.
+"""
+import json
+from typing import Any, Union
+
+# orjson is optional; it decodes JSON faster than the json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """
+    Decode a JSON document.
+
+    orjson rejects the NaN and Infinity tokens that the json module accepts, so
+    anything orjson refuses is decoded again with the json module. Responses
+    that parsed before orjson was used still parse, and invalid JSON raises
+    json.JSONDecodeError either way.
+
+    Args:
+        data: JSON text or UTF-8 encoded bytes
+
+    Returns:
+        The decoded value
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
@@ -0,0 +1,76 @@
+"""Shared pytest fixtures for the shelly_manager test suite."""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+# Directories made with tempfile.mkdtemp follow PYTEST_DEBUG_TEMPROOT as well as tmp_path,
+# so one opt-in setting moves every test file (e.g. to tmpfs at /dev/shm)
+if os.environ.get("PYTEST_DEBUG_TEMPROOT"):
+    tempfile.tempdir = os.environ["PYTEST_DEBUG_TEMPROOT"]
+
+import pytest
+import pytest_asyncio
+
+# uvloop is optional; async tests use it when installed (it does not support Windows)
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+from shelly_manager.models.device_config import DeviceConfigManager, device_config_manager as _default_config_manager
+
+# Seconds the shared discovery service spends scanning for devices before network tests run
+DISCOVERY_TIMEOUT = 30
+
+
+@pytest.fixture(scope="session")
+def device_config_manager() -> DeviceConfigManager:
+    """Device type configuration, parsed once per test session.
+
+    Reuses the module-level instance that ``Device`` already consults, so the
+    tests and the devices they build see the same parsed YAML.
+    """
+    return _default_config_manager
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def discovery_service():
+    """A started discovery service that has scanned for devices once per test session.
+
+    Only network tests request it, and they share the socket setup and the
+    discovery scan. Tests using it must run on the session event loop
+    (``@pytest.mark.asyncio(loop_scope="session")``).
+    """
+    from shelly_manager.discovery.discovery_service import DiscoveryService
+
+    service = DiscoveryService()
+    await service.start()
+    try:
+        try:
+            await asyncio.wait_for(service.discover_devices(), timeout=DISCOVERY_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+        yield service
+    finally:
+        await service.stop()
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def command_service(discovery_service):
+    """A started group command service for the default groups directory, shared per session."""
+    from shelly_manager.grouping.command_service import GroupCommandService
+    from shelly_manager.grouping.group_manager import GroupManager
+
+    service = GroupCommandService(GroupManager(), discovery_service)
+    await service.start()
+    yield service
+    await service.stop()
+
+
+if uvloop is not None and sys.platform != "win32":
+    @pytest.fixture(scope="session")
+    def event_loop_policy():
+        """Run async tests on uvloop's libuv-based event loop."""
+        return uvloop.EventLoopPolicy()
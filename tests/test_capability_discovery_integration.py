@@ -9,13 +9,9 @@ import asyncio
 from pathlib import Path
 from unittest.mock import patch, MagicMock, AsyncMock
 
-# Add the project directory to the Python path
-import sys
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-from src.shelly_manager.models.device import Device, DeviceGeneration, DeviceStatus
-from src.shelly_manager.models.device_capabilities import DeviceCapability, DeviceCapabilities
-from src.shelly_manager.discovery.discovery_service import DiscoveryService
+from shelly_manager.models.device import Device, DeviceGeneration, DeviceStatus
+from shelly_manager.models.device_capabilities import DeviceCapability, DeviceCapabilities
+from shelly_manager.discovery.discovery_service import DiscoveryService
 
 
 class TestCapabilityDiscoveryIntegration(unittest.TestCase):
@@ -27,7 +23,7 @@ class TestCapabilityDiscoveryIntegration(unittest.TestCase):
         self.temp_dir = tempfile.mkdtemp()
         
         # Patch the device_capabilities global instance
-        self.capabilities_patch = patch('src.shelly_manager.models.device_capabilities.device_capabilities')
+        self.capabilities_patch = patch('shelly_manager.models.device_capabilities.device_capabilities')
         self.mock_capabilities = self.capabilities_patch.start()
         
         # Create a capabilities manager for testing
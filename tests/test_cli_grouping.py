@@ -8,11 +8,10 @@ import subprocess
 import pytest
 from pathlib import Path
 
-# Add the project directory to the Python path
-import sys
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from shelly_manager.grouping.group_manager import GroupManager
 
-from src.shelly_manager.grouping.group_manager import GroupManager
+# The CLI runs in a subprocess, which does not see pytest's ``pythonpath`` setting
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 
 @pytest.fixture
@@ -27,6 +26,7 @@ def run_cli_command(command, env=None):
     """Run a CLI command and return its output."""
     if env is None:
         env = os.environ.copy()
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [SRC_DIR, env.get("PYTHONPATH")]))
     
     # Run the command and capture output
     result = subprocess.run(
@@ -48,7 +48,7 @@ def test_empty_group_listing(test_groups_dir):
     
     # Run the command to list groups
     result = run_cli_command(
-        "python -m src.shelly_manager.interfaces.cli.main groups list",
+        "python -m shelly_manager.interfaces.cli.main groups list",
         env=env
     )
     
@@ -65,7 +65,7 @@ def test_group_creation_and_listing(test_groups_dir):
     
     # Create a group
     create_result = run_cli_command(
-        "python -m src.shelly_manager.interfaces.cli.main groups create test_group --description 'Test group' --tags 'test,pytest'",
+        "python -m shelly_manager.interfaces.cli.main groups create test_group --description 'Test group' --tags 'test,pytest'",
         env=env
     )
     
@@ -79,7 +79,7 @@ def test_group_creation_and_listing(test_groups_dir):
     
     # List groups
     list_result = run_cli_command(
-        "python -m src.shelly_manager.interfaces.cli.main groups list",
+        "python -m shelly_manager.interfaces.cli.main groups list",
         env=env
     )
     
@@ -97,13 +97,13 @@ def test_group_details(test_groups_dir):
     
     # Create a group
     run_cli_command(
-        "python -m src.shelly_manager.interfaces.cli.main groups create test_group --description 'Test group details' --tags 'test,details'",
+        "python -m shelly_manager.interfaces.cli.main groups create test_group --description 'Test group details' --tags 'test,details'",
         env=env
     )
     
     # Show group details
     show_result = run_cli_command(
-        "python -m src.shelly_manager.interfaces.cli.main groups show test_group",
+        "python -m shelly_manager.interfaces.cli.main groups show test_group",
         env=env
     )
     
@@ -122,13 +122,13 @@ def test_adding_devices(test_groups_dir):
     
     # Create a group
     run_cli_command(
-        "python -m src.shelly_manager.interfaces.cli.main groups create test_group",
+        "python -m shelly_manager.interfaces.cli.main groups create test_group",
         env=env
     )
     
     # Add a device to the group
     add_result = run_cli_command(
-        "python -m src.shelly_manager.interfaces.cli.main groups add-device test_group AABBCCDDEEFF",
+        "python -m shelly_manager.interfaces.cli.main groups add-device test_group AABBCCDDEEFF",
         env=env
     )
     
@@ -138,7 +138,7 @@ def test_adding_devices(test_groups_dir):
     
     # Show group details to verify the device was added
     show_result = run_cli_command(
-        "python -m src.shelly_manager.interfaces.cli.main groups show test_group",
+        "python -m shelly_manager.interfaces.cli.main groups show test_group",
         env=env
     )
     
@@ -156,13 +156,13 @@ def test_updating_group(test_groups_dir):
     
     # Create a group
     run_cli_command(
-        "python -m src.shelly_manager.interfaces.cli.main groups create test_group --description 'Original description' --tags 'original'",
+        "python -m shelly_manager.interfaces.cli.main groups create test_group --description 'Original description' --tags 'original'",
         env=env
     )
     
     # Update the group
     update_result = run_cli_command(
-        "python -m src.shelly_manager.interfaces.cli.main groups update test_group --description 'Updated description' --tags 'updated'",
+        "python -m shelly_manager.interfaces.cli.main groups update test_group --description 'Updated description' --tags 'updated'",
         env=env
     )
     
@@ -172,7 +172,7 @@ def test_updating_group(test_groups_dir):
     
     # Show group details to verify the updates
     show_result = run_cli_command(
-        "python -m src.shelly_manager.interfaces.cli.main groups show test_group",
+        "python -m shelly_manager.interfaces.cli.main groups show test_group",
         env=env
     )
     
@@ -190,23 +190,23 @@ def test_removing_devices(test_groups_dir):
     
     # Create a group
     run_cli_command(
-        "python -m src.shelly_manager.interfaces.cli.main groups create test_group",
+        "python -m shelly_manager.interfaces.cli.main groups create test_group",
         env=env
     )
     
     # Add two devices to the group
     run_cli_command(
-        "python -m src.shelly_manager.interfaces.cli.main groups add-device test_group AABBCCDDEEFF",
+        "python -m shelly_manager.interfaces.cli.main groups add-device test_group AABBCCDDEEFF",
         env=env
     )
     run_cli_command(
-        "python -m src.shelly_manager.interfaces.cli.main groups add-device test_group 112233445566",
+        "python -m shelly_manager.interfaces.cli.main groups add-device test_group 112233445566",
         env=env
     )
     
     # Remove one device
     remove_result = run_cli_command(
-        "python -m src.shelly_manager.interfaces.cli.main groups remove-device test_group AABBCCDDEEFF",
+        "python -m shelly_manager.interfaces.cli.main groups remove-device test_group AABBCCDDEEFF",
         env=env
     )
     
@@ -216,7 +216,7 @@ def test_removing_devices(test_groups_dir):
     
     # Show group details to verify the device was removed
     show_result = run_cli_command(
-        "python -m src.shelly_manager.interfaces.cli.main groups show test_group",
+        "python -m shelly_manager.interfaces.cli.main groups show test_group",
         env=env
     )
     
@@ -233,11 +233,11 @@ def test_deleting_group(test_groups_dir):
     
     # Create two groups
     run_cli_command(
-        "python -m src.shelly_manager.interfaces.cli.main groups create group1",
+        "python -m shelly_manager.interfaces.cli.main groups create group1",
         env=env
     )
     run_cli_command(
-        "python -m src.shelly_manager.interfaces.cli.main groups create group2",
+        "python -m shelly_manager.interfaces.cli.main groups create group2",
         env=env
     )
     
@@ -249,7 +249,7 @@ def test_deleting_group(test_groups_dir):
     
     # Delete one group
     delete_result = run_cli_command(
-        "python -m src.shelly_manager.interfaces.cli.main groups delete group1",
+        "python -m shelly_manager.interfaces.cli.main groups delete group1",
         env=env
     )
     
@@ -263,7 +263,7 @@ def test_deleting_group(test_groups_dir):
     
     # List groups to verify only one remains
     list_result = run_cli_command(
-        "python -m src.shelly_manager.interfaces.cli.main groups list",
+        "python -m shelly_manager.interfaces.cli.main groups list",
         env=env
     )
     
@@ -279,7 +279,7 @@ def test_nonexistent_group(test_groups_dir):
     
     # Try to show a non-existent group
     show_result = run_cli_command(
-        "python -m src.shelly_manager.interfaces.cli.main groups show nonexistent_group",
+        "python -m shelly_manager.interfaces.cli.main groups show nonexistent_group",
         env=env
     )
     
@@ -288,7 +288,7 @@ def test_nonexistent_group(test_groups_dir):
     
     # Try to delete a non-existent group
     delete_result = run_cli_command(
-        "python -m src.shelly_manager.interfaces.cli.main groups delete nonexistent_group",
+        "python -m shelly_manager.interfaces.cli.main groups delete nonexistent_group",
         env=env
     )
     
@@ -6,14 +6,9 @@ import os
 import shutil
 import tempfile
 from pathlib import Path
-import yaml
 
-# Add the project directory to the Python path
-import sys
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-from src.shelly_manager.models.device import Device, DeviceGeneration, DeviceStatus
-from src.shelly_manager.models.device_capabilities import DeviceCapability, DeviceCapabilities
+from shelly_manager.models.device import Device, DeviceGeneration
+from shelly_manager.models.device_capabilities import DeviceCapability, DeviceCapabilities
 
 class TestDeviceCapabilities(unittest.TestCase):
     """Tests for the device capabilities system."""
@@ -1,28 +1,43 @@
 #!/usr/bin/env python
 """Tests for the DeviceRegistry class that manages device objects and loading from files."""
 
+import asyncio
 import unittest
 import os
 import shutil
 import tempfile
 from pathlib import Path
+import pytest
 import yaml
 
-# Add the project directory to the Python path
-import sys
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
 
-from src.shelly_manager.models.device import Device, DeviceGeneration, DeviceStatus
-from src.shelly_manager.models.device_registry import DeviceRegistry
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+from shelly_manager.models.device import Device, DeviceGeneration, DeviceStatus
+from shelly_manager.models.device_registry import DeviceRegistry
 
 
 class TestDeviceRegistry(unittest.TestCase):
     """Tests for the DeviceRegistry class."""
 
+    @pytest.fixture(autouse=True)
+    def _use_tmp_path(self, tmp_path):
+        """Provide a per-test directory managed (and cleaned up) by pytest."""
+        self.temp_dir = str(tmp_path)
+
     def setUp(self):
         """Set up the test environment."""
-        # Create a temporary directory for device files
-        self.temp_dir = tempfile.mkdtemp()
+        # Outside pytest (plain unittest) there is no tmp_path fixture
+        if not getattr(self, "temp_dir", None):
+            self.temp_dir = tempfile.mkdtemp()
+            self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
         self.device_registry = DeviceRegistry(devices_dir=self.temp_dir)
 
         # Create test device objects
@@ -53,11 +68,6 @@ class TestDeviceRegistry(unittest.TestCase):
             eco_mode_enabled=True
         )
 
-    def tearDown(self):
-        """Clean up the test environment."""
-        # Remove the temporary directory
-        shutil.rmtree(self.temp_dir)
-
     def test_save_device(self):
         """Test saving a device to a file."""
         # Save the gen1 device
@@ -65,17 +75,17 @@ class TestDeviceRegistry(unittest.TestCase):
         self.assertTrue(result)
 
         # Check that the file exists
-        device_files = list(Path(self.temp_dir).glob("*.yaml"))
+        device_files = [n for n in os.listdir(self.temp_dir) if n.endswith(".yaml")]
         self.assertEqual(len(device_files), 1)
         
         # Verify filename format
-        filename = device_files[0].name
+        filename = device_files[0]
         self.assertTrue(filename.startswith("SHPLG-S_"))
         self.assertTrue(filename.endswith(".yaml"))
         
         # Check the file contents
-        with open(device_files[0], 'r') as f:
-            loaded_data = yaml.safe_load(f)
+        with open(os.path.join(self.temp_dir, device_files[0]), 'r') as f:
+            loaded_data = yaml.load(f, Loader=_Loader)
         
         self.assertEqual(loaded_data["id"], self.gen1_device.id)
         self.assertEqual(loaded_data["name"], self.gen1_device.name)
@@ -90,17 +100,17 @@ class TestDeviceRegistry(unittest.TestCase):
         self.assertTrue(result)
 
         # Check that the file exists
-        device_files = list(Path(self.temp_dir).glob("*.yaml"))
+        device_files = [n for n in os.listdir(self.temp_dir) if n.endswith(".yaml")]
         self.assertEqual(len(device_files), 1)
         
         # Verify filename format
-        filename = device_files[0].name
+        filename = device_files[0]
         self.assertTrue(filename.startswith("shellyplus2pm_"))
         self.assertTrue(filename.endswith(".yaml"))
         
         # Check the file contents
-        with open(device_files[0], 'r') as f:
-            loaded_data = yaml.safe_load(f)
+        with open(os.path.join(self.temp_dir, device_files[0]), 'r') as f:
+            loaded_data = yaml.load(f, Loader=_Loader)
         
         self.assertEqual(loaded_data["id"], self.gen2_device.id)
         self.assertEqual(loaded_data["name"], self.gen2_device.name)
@@ -158,6 +168,23 @@ class TestDeviceRegistry(unittest.TestCase):
         self.assertIn(self.gen1_device.id, device_ids)
         self.assertIn(self.gen2_device.id, device_ids)
 
+    def test_get_devices_async(self):
+        """Test getting multiple devices concurrently from a cold cache."""
+        self.device_registry.save_device(self.gen1_device)
+        self.device_registry.save_device(self.gen2_device)
+        
+        # Use a fresh registry so every device is loaded from file
+        registry = DeviceRegistry(devices_dir=self.temp_dir)
+        loaded_devices = asyncio.run(registry.get_devices_async([
+            "AABBCCDDEEFF",
+            "B0A73248B180",
+            "nonexistent"  # This should be ignored
+        ]))
+        
+        # Results keep the input order
+        self.assertEqual([device.id for device in loaded_devices],
+                         [self.gen1_device.id, self.gen2_device.id])
+
     def test_load_all_devices(self):
         """Test loading all devices from the devices directory."""
         # Save both devices
@@ -199,7 +226,7 @@ class TestDeviceRegistry(unittest.TestCase):
         self.assertTrue(result)
         
         # List files in the directory to verify it was saved
-        files = list(Path(self.temp_dir).glob("*.yaml"))
+        files = [n for n in os.listdir(self.temp_dir) if n.endswith(".yaml")]
         self.assertEqual(len(files), 1)
         
         # Create a new registry instance to test loading from file
@@ -267,6 +294,51 @@ class TestDeviceRegistry(unittest.TestCase):
         self.assertIsNotNone(retrieved_device)
         self.assertEqual(retrieved_device.id, self.gen1_device.id)
 
+    def test_resave_within_one_clock_tick(self):
+        """Test that a same-size rewrite with an unchanged mtime is not served from the parse cache."""
+        self.device_registry.save_device(self.gen1_device)
+        yaml_path = next(Path(self.temp_dir).glob("*.yaml"))
+        st = os.stat(yaml_path)
+        DeviceRegistry(devices_dir=self.temp_dir).load_all_devices()
+        
+        # Same length IP, and the mtime a coarse clock would have left unchanged
+        self.gen1_device.ip_address = "192.168.1.101"
+        self.device_registry.save_device(self.gen1_device)
+        os.utime(yaml_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        self.assertEqual(os.stat(yaml_path).st_size, st.st_size)
+        
+        loaded = DeviceRegistry(devices_dir=self.temp_dir).load_all_devices()
+        self.assertEqual(loaded[0].ip_address, "192.168.1.101")
+
+    @unittest.skipUnless(msgspec, "msgspec is not installed")
+    def test_sidecar_cache(self):
+        """Test that the msgpack sidecar is opt-in and only used for the exact YAML it mirrors."""
+        self.device_registry.save_device(self.gen1_device)
+        yaml_path = next(Path(self.temp_dir).glob("*.yaml"))
+        sidecar_path = yaml_path.with_suffix(".mp")
+        self.assertFalse(sidecar_path.exists())
+        
+        registry = DeviceRegistry(devices_dir=self.temp_dir, use_sidecar=True)
+        registry.save_device(self.gen1_device)
+        self.assertTrue(sidecar_path.exists())
+        loaded = DeviceRegistry(devices_dir=self.temp_dir, use_sidecar=True).load_all_devices()
+        self.assertEqual(loaded[0].name, self.gen1_device.name)
+        
+        # Restore an older YAML (e.g. cp -p): its mtime predates the sidecar
+        st = os.stat(yaml_path)
+        data = yaml.load(yaml_path.read_text(encoding="utf-8"), Loader=_Loader)
+        data["name"] = "Restored Gen1 Device"
+        with open(yaml_path, 'w', encoding='utf-8') as f:
+            yaml.safe_dump(data, f)
+        os.utime(yaml_path, ns=(st.st_atime_ns, st.st_mtime_ns - 10**10))
+        
+        loaded = DeviceRegistry(devices_dir=self.temp_dir, use_sidecar=True).load_all_devices()
+        self.assertEqual(loaded[0].name, "Restored Gen1 Device")
+        
+        # Saving without sidecars removes the stale copy
+        self.device_registry.save_device(self.gen1_device)
+        self.assertFalse(sidecar_path.exists())
+
     def test_device_cache(self):
         """Test adding and retrieving devices from the registry cache."""
         # Add a device to the registry
@@ -2,33 +2,34 @@
 """Test script for direct group operations without network scanning."""
 
 import asyncio
-import sys
+import os
 import logging
 import argparse
 import pytest
-from pathlib import Path
 from typing import List, Dict, Any
 
-# Add the src directory to the path
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
 from shelly_manager.grouping.group_manager import GroupManager
 from shelly_manager.grouping.command_service import GroupCommandService
 from shelly_manager.models.device import Device, DeviceGeneration
 from shelly_manager.models.device_registry import device_registry
 from shelly_manager.utils.logging import LogConfig
 
-# Configure logging
-log_config = LogConfig(
-    app_name="test_direct_group_operations",
-    debug=True,
-    log_to_file=True,
-    log_to_console=True
-)
-log_config.setup()
+from test_group_operations import _await_state, _switch_states
+
 logger = logging.getLogger("test_direct_group_operations")
 
 
+@pytest.fixture(autouse=True, scope="module")
+def configure_logging():
+    """Configure logging when this module's tests run; set TEST_LOG_FILE=1 for a log file."""
+    LogConfig.setup(
+        app_name="test_direct_group_operations",
+        debug=False,
+        log_to_file=os.environ.get("TEST_LOG_FILE") == "1",
+        log_to_console=False
+    )
+
+
 @pytest.fixture
 def test_group_name():
     """Fixture to provide a test group name."""
@@ -100,7 +101,7 @@ async def test_direct_group_operations(test_group_name):
     else:
         # Try to load devices from registry
         logger.info(f"Attempting to load {len(target_group.device_ids)} devices from registry")
-        devices = device_registry.get_devices(target_group.device_ids)
+        devices = await device_registry.get_devices_async(target_group.device_ids)
         
         # If we have missing devices, log them
         if len(devices) < len(target_group.device_ids):
@@ -125,20 +126,19 @@ async def test_direct_group_operations(test_group_name):
     try:
         # Get status
         logger.info("Getting group status")
+        initial_states = {}
         try:
             status_result = await asyncio.wait_for(
                 command_service.get_group_status(target_group.name),
                 timeout=10.0
             )
             logger.info(f"Status result: {status_result}")
+            initial_states = _switch_states(status_result)
         except asyncio.TimeoutError:
             logger.warning("Status operation timed out")
         except Exception as e:
             logger.error(f"Error getting status: {e}")
         
-        # Wait between operations
-        await asyncio.sleep(operation_delay)
-        
         # Toggle devices
         logger.info("Toggling devices in group")
         try:
@@ -152,8 +152,12 @@ async def test_direct_group_operations(test_group_name):
         except Exception as e:
             logger.error(f"Error toggling devices: {e}")
         
-        # Wait between operations
-        await asyncio.sleep(operation_delay)
+        # Wait until the toggled outputs have flipped
+        await _await_state(
+            command_service, target_group.name,
+            lambda states: all(states.get(d) != on for d, on in initial_states.items()),
+            timeout=operation_delay
+        )
         
         # Turn off devices
         logger.info("Turning off devices in group")
@@ -168,8 +172,12 @@ async def test_direct_group_operations(test_group_name):
         except Exception as e:
             logger.error(f"Error turning off devices: {e}")
         
-        # Wait between operations
-        await asyncio.sleep(operation_delay)
+        # Wait until every output reports off
+        await _await_state(
+            command_service, target_group.name,
+            lambda states: not any(states.values()),
+            timeout=operation_delay
+        )
         
         # Turn on devices
         logger.info("Turning on devices in group")
@@ -203,6 +211,12 @@ def parse_args():
 
 if __name__ == "__main__":
     args = parse_args()
+    LogConfig.setup(
+        app_name="test_direct_group_operations",
+        debug=True,
+        log_to_file=True,
+        log_to_console=True
+    )
     try:
         asyncio.run(test_direct_group_operations(args.group))
     except KeyboardInterrupt:
@@ -9,13 +9,22 @@ import threading
 import time
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from unittest.mock import patch
 
-# Add the project directory to the Python path
-import sys
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from shelly_manager.grouping.models import DeviceGroup
+from shelly_manager.grouping.group_manager import GroupManager
 
-from src.shelly_manager.grouping.models import DeviceGroup
-from src.shelly_manager.grouping.group_manager import GroupManager
+# One temporary root per module; each test gets its own subdirectory of it
+_MODULE_TMP = None
+
+
+def setUpModule():
+    global _MODULE_TMP
+    _MODULE_TMP = tempfile.mkdtemp(prefix='shelly_groups_')
+
+
+def tearDownModule():
+    shutil.rmtree(_MODULE_TMP, ignore_errors=True)
 
 
 class TestGroupConcurrency(unittest.TestCase):
@@ -23,8 +32,9 @@ class TestGroupConcurrency(unittest.TestCase):
 
     def setUp(self):
         """Set up the test environment."""
-        # Create a temporary directory for the group files
-        self.temp_dir = tempfile.mkdtemp()
+        # Create a directory for the group files under the module's temporary root
+        self.temp_dir = os.path.join(_MODULE_TMP, self._testMethodName)
+        os.mkdir(self.temp_dir)
         self.group_manager = GroupManager(groups_dir=self.temp_dir)
 
     def tearDown(self):
@@ -320,6 +330,79 @@ class TestGroupConcurrency(unittest.TestCase):
         manager2_group = manager2.get_group("shared")
         self.assertIn("device3", manager2_group.device_ids)
 
+    def test_deferred_flush(self):
+        """Test that deferred writes reach disk once per burst, on flush()."""
+        manager = GroupManager(groups_dir=self.temp_dir, flush_interval=60)
+        manager.create_group(name="deferred", description="Deferred writes")
+        
+        file_path = os.path.join(self.temp_dir, "deferred.yaml")
+        self.assertFalse(os.path.exists(file_path))
+        
+        # Add devices concurrently; nothing is written until the flush
+        device_ids = [f"device_{i}" for i in range(20)]
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            self.assertTrue(all(executor.map(
+                lambda device_id: manager.add_device_to_group("deferred", device_id), device_ids
+            )))
+        self.assertFalse(os.path.exists(file_path))
+        
+        manager.flush()
+        
+        # A new instance sees the full state
+        reloaded = GroupManager(groups_dir=self.temp_dir).get_group("deferred")
+        self.assertEqual(sorted(reloaded.device_ids), sorted(device_ids))
+
+    def test_close_stops_flush_thread_and_retries_failed_writes(self):
+        """Test that a failed deferred write stays dirty and close() stops the flush thread."""
+        manager = GroupManager(groups_dir=self.temp_dir, flush_interval=60)
+        manager.create_group(name="retry", description="Deferred write that fails once")
+        flush_thread = manager._flush_thread
+        
+        with patch.object(manager, "_save_group", return_value=False):
+            self.assertFalse(manager.flush())
+        self.assertIn("retry", manager._dirty)
+        
+        # close() retries the write and stops the thread
+        manager.close()
+        self.assertFalse(flush_thread.is_alive())
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, "retry.yaml")))
+        self.assertFalse(manager._dirty)
+
+    def test_readers_do_not_block_each_other(self):
+        """Test that group reads share the lock while writes wait for them."""
+        self.group_manager.create_group(name="shared", description="Shared group")
+        lock = self.group_manager._groups_lock
+        
+        # Both readers and this thread; passing it means both readers hold the lock
+        reading = threading.Barrier(3, timeout=5)
+        released = threading.Event()
+        
+        def reader():
+            with lock.gen_rlock():
+                # Both readers must be inside at once to pass the barrier
+                reading.wait()
+                released.wait(5)
+        
+        readers = [threading.Thread(target=reader) for _ in range(2)]
+        for thread in readers:
+            thread.start()
+        reading.wait()
+        
+        # A write has to wait until both readers are done
+        writer = threading.Thread(
+            target=self.group_manager.add_device_to_group, args=("shared", "device1")
+        )
+        writer.start()
+        writer.join(0.2)
+        self.assertTrue(writer.is_alive())
+        # Peek without the lock: new readers queue behind the waiting writer
+        self.assertEqual(self.group_manager.groups["shared"].device_ids, [])
+        
+        released.set()
+        for thread in readers + [writer]:
+            thread.join(5)
+        self.assertEqual(self.group_manager.get_group("shared").device_ids, ["device1"])
+
 
 if __name__ == "__main__":
     unittest.main() 
\ No newline at end of file
@@ -7,13 +7,29 @@ import shutil
 import tempfile
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
-# Add the project directory to the Python path
-import sys
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from shelly_manager.grouping.models import DeviceGroup
+from shelly_manager.grouping.group_manager import (
+    GroupManager, GROUP_STORE_FILENAME, _emit_group, _load_group_data_cached, _DUMP_KWARGS
+)
 
-from src.shelly_manager.grouping.models import DeviceGroup
-from src.shelly_manager.grouping.group_manager import GroupManager
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# One temporary root per module; each test gets its own subdirectory of it
+_MODULE_TMP = None
+
+
+def setUpModule():
+    global _MODULE_TMP
+    _MODULE_TMP = tempfile.mkdtemp(prefix='shelly_groups_')
+
+
+def tearDownModule():
+    shutil.rmtree(_MODULE_TMP, ignore_errors=True)
 
 
 class TestGroupFileHandling(unittest.TestCase):
@@ -21,8 +37,9 @@ class TestGroupFileHandling(unittest.TestCase):
 
     def setUp(self):
         """Set up the test environment."""
-        # Create a temporary directory for the group files
-        self.temp_dir = tempfile.mkdtemp()
+        # Create a directory for the group files under the module's temporary root
+        self.temp_dir = os.path.join(_MODULE_TMP, self._testMethodName)
+        os.mkdir(self.temp_dir)
         self.group_manager = GroupManager(groups_dir=self.temp_dir)
 
     def tearDown(self):
@@ -84,6 +101,111 @@ class TestGroupFileHandling(unittest.TestCase):
         self.assertEqual(content["tags"], ["test", "structure"])
         self.assertEqual(content["config"], {"key1": "value1", "key2": 123})
 
+        # Loading and saving again leaves the file byte-for-byte the same
+        with open(file_path, 'rb') as f:
+            saved = f.read()
+        reloaded = GroupManager(groups_dir=self.temp_dir).get_group("test_file_structure")
+        os.remove(file_path)
+        self.assertTrue(self.group_manager._save_group(reloaded))
+        with open(file_path, 'rb') as f:
+            self.assertEqual(f.read(), saved)
+
+    def test_duplicate_device_ids_dropped_on_load(self):
+        """Test that duplicate device IDs in a group file are dropped in order on load."""
+        file_path = os.path.join(self.temp_dir, "duplicates.yaml")
+        with open(file_path, 'w') as f:
+            yaml.safe_dump({"name": "duplicates", "device_ids": ["b", "a", "b", "c", "a"]}, f)
+
+        group = GroupManager(groups_dir=self.temp_dir).get_group("duplicates")
+        self.assertEqual(group.device_ids, ["b", "a", "c"])
+
+    def test_large_group_file_loads(self):
+        """Test that group files above the memory-map threshold load correctly."""
+        device_ids = [f"shellyplus1pm-{i:012x}" for i in range(500)]
+        self.group_manager.create_group(name="large", description="Grüße", device_ids=device_ids)
+        file_path = os.path.join(self.temp_dir, "large.yaml")
+        self.assertGreater(os.path.getsize(file_path), 4096)
+
+        group = GroupManager(groups_dir=self.temp_dir).get_group("large")
+        self.assertEqual(group.device_ids, device_ids)
+        self.assertEqual(group.description, "Grüße")
+
+    @unittest.skipIf(zstandard is None, "zstandard is not installed")
+    def test_compressed_group_files(self):
+        """Test writing compressed group files and switching between formats."""
+        self.group_manager.create_group(name="plain", device_ids=["device1"])
+
+        manager = GroupManager(groups_dir=self.temp_dir, compress=True)
+        manager.create_group(name="packed", device_ids=["device2"])
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, "packed.yaml.zst")))
+
+        # Rewriting a plain group compressed replaces its plain file
+        manager.add_device_to_group("plain", "device3")
+        self.assertEqual(sorted(os.listdir(self.temp_dir)), ["packed.yaml.zst", "plain.yaml.zst"])
+
+        # An uncompressing manager reads both formats
+        reloaded = GroupManager(groups_dir=self.temp_dir)
+        self.assertEqual(reloaded.get_group("packed").device_ids, ["device2"])
+        self.assertEqual(reloaded.get_group("plain").device_ids, ["device1", "device3"])
+
+    def test_single_file_storage(self):
+        """Test keeping all groups in one groups.store.yaml."""
+        manager = GroupManager(groups_dir=self.temp_dir, storage="single_file")
+        manager.create_group(name="group/one", device_ids=["device1"])
+        manager.create_group(name="group2", device_ids=["device2"])
+        manager.add_device_to_group("group2", "device3")
+        manager._delete_group("group/one")
+        self.assertEqual(os.listdir(self.temp_dir), [GROUP_STORE_FILENAME])
+
+        reloaded = GroupManager(groups_dir=self.temp_dir, storage="single_file")
+        self.assertEqual(list(reloaded.groups), ["group2"])
+        self.assertEqual(reloaded.get_group("group2").device_ids, ["device2", "device3"])
+
+        with self.assertRaises(ValueError):
+            GroupManager(groups_dir=self.temp_dir, storage="sqlite")
+
+    def test_single_file_storage_keeps_foreign_files(self):
+        """Test that single-file storage ignores groups.yaml and never overwrites an unreadable store."""
+        legacy_path = os.path.join(self.temp_dir, "groups.yaml")
+        with open(legacy_path, 'w') as f:
+            f.write("groups_file: legacy\n")
+        
+        manager = GroupManager(groups_dir=self.temp_dir, storage="single_file")
+        manager.create_group(name="group1", device_ids=["device1"])
+        with open(legacy_path, 'r') as f:
+            self.assertEqual(f.read(), "groups_file: legacy\n")
+        
+        # A store that no longer parses as one is left for the user to fix
+        store_path = os.path.join(self.temp_dir, GROUP_STORE_FILENAME)
+        with open(store_path, 'w') as f:
+            f.write("- not a group store\n")
+        manager = GroupManager(groups_dir=self.temp_dir, storage="single_file")
+        self.assertEqual(manager.groups, {})
+        self.assertFalse(manager._save_group_store())
+        with open(store_path, 'r') as f:
+            self.assertEqual(f.read(), "- not a group store\n")
+
+    def test_fast_emitter_matches_yaml_dump(self):
+        """Test that the direct group emitter writes exactly what yaml.dump would."""
+        group = DeviceGroup(
+            name="living-room",
+            description="Living room lights",
+            device_ids=["shellyplus1pm-a8032ab12345", "shelly1-123456"],
+            tags=["floor1", "lights"],
+            config={"transition": 2, "nested": {"key": "value: with colon"}}
+        )
+        group_dict = group.to_dict()
+        self.assertEqual(
+            _emit_group(group_dict),
+            yaml.dump(group_dict, encoding='utf-8', **_DUMP_KWARGS)
+        )
+
+        # Strings YAML would need to quote are left to yaml.dump
+        group.description = "Lights: living room"
+        self.assertIsNone(_emit_group(group.to_dict()))
+        group.description = "On"
+        self.assertIsNone(_emit_group(group.to_dict()))
+
     def test_reload_from_files(self):
         """Test that groups can be correctly reloaded from files."""
         # Create some groups
@@ -126,6 +248,21 @@ class TestGroupFileHandling(unittest.TestCase):
         self.assertEqual(group2.tags, ["tag3"])
         self.assertEqual(group2.config, {"key2": "value2"})
 
+    def test_reload_reuses_parsed_files(self):
+        """Test that reloading unchanged group files reuses the earlier parse."""
+        self.group_manager.create_group(name="cached", tags=["tag1"], config={"key": "value"})
+        first = GroupManager(groups_dir=self.temp_dir).get_group("cached")
+        hits = _load_group_data_cached.cache_info().hits
+
+        second = GroupManager(groups_dir=self.temp_dir).get_group("cached")
+        self.assertEqual(_load_group_data_cached.cache_info().hits, hits + 1)
+
+        # Each load gets its own copy of the parsed data
+        first.tags.append("tag2")
+        first.config["key"] = "changed"
+        self.assertEqual(second.tags, ["tag1"])
+        self.assertEqual(second.config, {"key": "value"})
+
     def test_malformed_yaml_handling(self):
         """Test that malformed YAML files are handled gracefully."""
         # Create a valid group
@@ -165,6 +302,15 @@ class TestGroupFileHandling(unittest.TestCase):
         # Check that the groups dictionary is empty
         self.assertEqual(len(empty_manager.groups), 0)
 
+    def test_groups_loaded_on_first_use(self):
+        """Test that a manager reads the groups directory when first used, not when created."""
+        manager = GroupManager(groups_dir=self.temp_dir)
+
+        # Written by another manager after this one was constructed
+        self.group_manager.create_group(name="late", device_ids=["device1"])
+
+        self.assertEqual(manager.get_group("late").device_ids, ["device1"])
+
     def test_unicode_handling(self):
         """Test that group names with Unicode characters are handled correctly."""
         # Create groups with Unicode characters
@@ -231,6 +377,104 @@ class TestGroupFileHandling(unittest.TestCase):
         self.assertTrue(os.access(file_path, os.R_OK))
         self.assertTrue(os.access(file_path, os.W_OK))
 
+    def test_journaled_device_changes(self):
+        """Test that journaled device changes are replayed and compacted on reload."""
+        manager = GroupManager(groups_dir=self.temp_dir, use_journal=True)
+        manager.create_group(name="journaled", description="Journaled group")
+        
+        manager.add_device_to_group("journaled", "device1")
+        manager.add_device_to_group("journaled", "device2")
+        manager.remove_device_from_group("journaled", "device1")
+        manager.close()
+        
+        # The group file is untouched; the changes live in the journal
+        file_path = os.path.join(self.temp_dir, "journaled.yaml")
+        journal_path = os.path.join(self.temp_dir, "journaled.journal")
+        with open(file_path, 'r') as f:
+            self.assertEqual(yaml.safe_load(f)["device_ids"], [])
+        self.assertTrue(os.path.exists(journal_path))
+        
+        # Reloading applies the journal and folds it back into the group file
+        new_manager = GroupManager(groups_dir=self.temp_dir)
+        self.assertEqual(new_manager.get_group("journaled").device_ids, ["device2"])
+        self.assertFalse(os.path.exists(journal_path))
+        with open(file_path, 'r') as f:
+            self.assertEqual(yaml.safe_load(f)["device_ids"], ["device2"])
+
+    def test_rewrite_shrinks_file(self):
+        """Test that rewriting a group file drops content from a longer previous save."""
+        device_ids = [f"device_{i}" for i in range(20)]
+        self.group_manager.create_group(name="shrinking", device_ids=device_ids)
+        for device_id in device_ids[1:]:
+            self.group_manager.remove_device_from_group("shrinking", device_id)
+        
+        file_path = os.path.join(self.temp_dir, "shrinking.yaml")
+        with open(file_path, 'r') as f:
+            self.assertEqual(yaml.safe_load(f)["device_ids"], ["device_0"])
+        
+        # A file deleted behind the manager's back is recreated on the next save
+        os.remove(file_path)
+        self.group_manager.add_device_to_group("shrinking", "device_1")
+        with open(file_path, 'r') as f:
+            self.assertEqual(yaml.safe_load(f)["device_ids"], ["device_0", "device_1"])
+
+    def test_atomic_saves_leave_no_temp_files(self):
+        """Test that saves replace group files whole and clean up after themselves."""
+        manager = GroupManager(groups_dir=self.temp_dir, durable=True)
+        manager.create_group(name="atomic", description="Atomic writes")
+        file_path = os.path.join(self.temp_dir, "atomic.yaml")
+        inode = os.stat(file_path).st_ino
+        
+        manager.add_device_to_group("atomic", "device1")
+        
+        # The save published a new file rather than rewriting the old one
+        self.assertNotEqual(os.stat(file_path).st_ino, inode)
+        self.assertEqual(os.listdir(self.temp_dir), ["atomic.yaml"])
+        with open(file_path, 'r') as f:
+            self.assertEqual(yaml.safe_load(f)["device_ids"], ["device1"])
+
+    @unittest.skipUnless(hasattr(os, "fchmod"), "needs os.fchmod")
+    def test_atomic_save_keeps_file_mode(self):
+        """Test that replacing a group file keeps the mode the user gave it."""
+        self.group_manager.create_group(name="private", description="Private group")
+        file_path = os.path.join(self.temp_dir, "private.yaml")
+        os.chmod(file_path, 0o600)
+        
+        self.group_manager.add_device_to_group("private", "device1")
+        
+        self.assertEqual(os.stat(file_path).st_mode & 0o777, 0o600)
+
+    def test_atomic_save_handles_short_writes(self):
+        """Test that a payload written in several partial writes is saved in full."""
+        real_write = os.write
+        
+        def short_write(fd, data):
+            return real_write(fd, bytes(data[:7]))
+        
+        device_ids = [f"device_{i}" for i in range(20)]
+        with patch("shelly_manager.grouping.group_manager.os.write", side_effect=short_write):
+            self.group_manager.create_group(name="chunked", device_ids=device_ids)
+        
+        with open(os.path.join(self.temp_dir, "chunked.yaml"), 'r') as f:
+            self.assertEqual(yaml.safe_load(f)["device_ids"], device_ids)
+
+    def test_unchanged_group_is_not_rewritten(self):
+        """Test that saving a group with unchanged content skips the write."""
+        group = self.group_manager.create_group(name="steady", device_ids=["device1"])
+        file_path = os.path.join(self.temp_dir, "steady.yaml")
+        inode = os.stat(file_path).st_ino
+        
+        self.assertTrue(self.group_manager._save_group(group))
+        self.assertEqual(os.stat(file_path).st_ino, inode)
+        
+        # A file replaced by someone else is rewritten even if our content is unchanged
+        with open(file_path + ".new", 'w') as f:
+            yaml.safe_dump({"name": "steady", "device_ids": []}, f)
+        os.replace(file_path + ".new", file_path)
+        self.assertTrue(self.group_manager._save_group(group))
+        with open(file_path, 'r') as f:
+            self.assertEqual(yaml.safe_load(f)["device_ids"], ["device1"])
+
 
 if __name__ == "__main__":
     unittest.main() 
\ No newline at end of file
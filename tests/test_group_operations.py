@@ -2,51 +2,148 @@
 """Test script for group operations functionality."""
 
 import asyncio
-import sys
 import logging
 import argparse
-from pathlib import Path
+import contextlib
+import os
 import pytest
-from unittest.mock import patch, AsyncMock
+from unittest.mock import create_autospec
 
-# Add the src directory to the path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# uvloop is optional (and unavailable on Windows); scripted runs use it when installed
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
 from shelly_manager.grouping.group_manager import GroupManager
 from shelly_manager.grouping.command_service import GroupCommandService
 from shelly_manager.discovery.discovery_service import DiscoveryService
 from shelly_manager.utils.logging import LogConfig
 
-# Configure logging
-log_config = LogConfig(
-    app_name="test_group_operations",
-    debug=True,
-    log_to_file=True,
-    log_to_console=True
-)
-log_config.setup()
 logger = logging.getLogger("test_group_operations")
 
 
-@pytest.mark.asyncio
+def configure_logging(log_to_file):
+    """Set up console (and optionally file) logging; each pytest-xdist worker gets its own log file."""
+    xdist_worker = os.environ.get("PYTEST_XDIST_WORKER")
+    LogConfig.setup(
+        app_name=f"test_group_operations_{xdist_worker}" if xdist_worker else "test_group_operations",
+        debug=True,
+        log_to_file=log_to_file,
+        log_to_console=True
+    )
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _configure_logging():
+    """Configure logging once tests in this module actually run, not when they are collected.
+
+    Writing to a log file is opt-in with TEST_LOG_FILE=1.
+    """
+    configure_logging(log_to_file=os.environ.get("TEST_LOG_FILE") == "1")
+
+
+@contextlib.asynccontextmanager
+async def eager_tasks():
+    """Let tasks that finish without blocking skip the event loop round trip (Python 3.12+).
+
+    The previous task factory is restored on exit, so the eager factory does not
+    leak into later tests sharing the session event loop. Also usable as a
+    decorator on async test functions.
+    """
+    loop = asyncio.get_running_loop()
+    previous_factory = loop.get_task_factory()
+    if hasattr(asyncio, "eager_task_factory"):
+        loop.set_task_factory(asyncio.eager_task_factory)
+    try:
+        yield
+    finally:
+        loop.set_task_factory(previous_factory)
+
+
+async def _call_with_timeout(description, coro, timeout=10.0):
+    """Await ``coro``, logging a warning and returning None if it takes longer than ``timeout``.
+
+    Uses ``asyncio.timeout`` (Python 3.11+), which is cheaper than wrapping the
+    call in a task with ``asyncio.wait_for``; older Pythons fall back to the latter.
+    """
+    try:
+        if hasattr(asyncio, "timeout"):
+            async with asyncio.timeout(timeout):
+                return await coro
+        return await asyncio.wait_for(coro, timeout=timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"{description} operation timed out")
+        return None
+
+
+def _switch_states(status):
+    """Map each device in a group status result to its relay/switch output.
+
+    Handles Gen1 (``relays[0].ison``) and Gen2 (``switch:0.output``) status
+    payloads; devices without a switch or that failed to answer are left out.
+    """
+    states = {}
+    for device_id, device_result in (status.get("results") or {}).items():
+        data = device_result.get("result") if isinstance(device_result, dict) else None
+        if not isinstance(data, dict):
+            continue
+        if data.get("relays"):
+            states[device_id] = bool(data["relays"][0].get("ison"))
+        elif isinstance(data.get("switch:0"), dict):
+            states[device_id] = bool(data["switch:0"].get("output"))
+    return states
+
+
+async def _await_state(command_service, group_name, predicate, timeout=2.0, poll=0.05):
+    """Poll the group status until ``predicate(states)`` holds or ``timeout`` expires.
+
+    Args:
+        command_service: Service used to query the group status.
+        group_name: Name of the group to poll.
+        predicate: Called with the output of ``_switch_states``.
+        timeout: Maximum number of seconds to wait.
+        poll: Delay in seconds between status queries.
+
+    Returns:
+        The last switch states read, or None if no status could be read in time.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    states = None
+    while True:
+        status = await _call_with_timeout(
+            "Status", command_service.get_group_status(group_name),
+            timeout=max(deadline - loop.time(), poll)
+        )
+        if status is not None:
+            states = _switch_states(status)
+            if predicate(states):
+                return states
+        if loop.time() + poll > deadline:
+            logger.warning(f"Group '{group_name}' did not reach the expected state within {timeout}s")
+            return states
+        await asyncio.sleep(poll)
+
+
+@pytest.mark.asyncio(loop_scope="session")
 @pytest.mark.network  # Mark this test as requiring network connectivity
 # Comment out this line to enable the test
 # @pytest.mark.skip(reason="Requires actual network connectivity and configured groups")
-async def test_group_operations(group_name=None, discovery_timeout=30, operation_delay=2):
+@eager_tasks()
+async def test_group_operations(discovery_service, command_service, group_name=None, operation_delay=2):
     """Test group operations functionality.
     
     Args:
+        discovery_service: Started discovery service that has already scanned for devices.
+        command_service: Started group command service using discovery_service.
         group_name: Optional name of the group to test. If None, uses the first available group.
-        discovery_timeout: Timeout in seconds for device discovery.
-        operation_delay: Delay in seconds between operations.
+        operation_delay: Maximum time in seconds to wait for devices to settle between operations.
     """
     logger.info("Starting group operations test")
     
-    # Initialize the group manager
-    group_manager = GroupManager()
-    
     # List available groups
-    groups = group_manager.list_groups()
+    groups = command_service.group_manager.list_groups()
     logger.info(f"Available groups: {', '.join(g.name for g in groups) if groups else 'None'}")
     
     if not groups:
@@ -69,146 +166,152 @@ async def test_group_operations(group_name=None, discovery_timeout=30, operation
     
     logger.info(f"Testing with group: {target_group.name}")
     
-    # Create a discovery service
-    discovery_service = DiscoveryService()
+    devices = discovery_service._get_sorted_devices()
+    logger.info(f"Discovered {len(devices)} devices")
     
-    # Start the discovery service
-    logger.info("Starting discovery service")
-    await discovery_service.start()
+    if not devices:
+        logger.warning("No devices found. Skipping remaining tests.")
+        pytest.skip("No devices found for testing")
+        return
     
-    try:
-        # Discover devices with a timeout to prevent hanging
-        logger.info(f"Discovering devices (with {discovery_timeout}s timeout)")
-        try:
-            await asyncio.wait_for(
-                discovery_service.discover_devices(),
-                timeout=float(discovery_timeout)  # Configurable timeout for discovery
-            )
-        except asyncio.TimeoutError:
-            logger.warning(f"Device discovery timed out after {discovery_timeout} seconds")
-        
-        devices = discovery_service._get_sorted_devices()
-        logger.info(f"Discovered {len(devices)} devices")
-        
-        if not devices:
-            logger.warning("No devices found. Skipping remaining tests.")
-            pytest.skip("No devices found for testing")
-            return
-        
-        # Create a group command service
-        logger.info("Creating group command service")
-        command_service = GroupCommandService(group_manager, discovery_service)
-        
-        # Start the command service
-        await command_service.start()
-        
-        # Test operations on the selected group
-        logger.info(f"Testing operations on group: {target_group.name}")
-        
-        # Get status with timeout
-        logger.info("Getting group status")
-        try:
-            status_result = await asyncio.wait_for(
-                command_service.get_group_status(target_group.name),
-                timeout=10.0
-            )
-            logger.info(f"Status result: {status_result}")
-        except asyncio.TimeoutError:
-            logger.warning("Status operation timed out")
-            
-        # Wait between operations
-        await asyncio.sleep(operation_delay)
-        
-        # Toggle devices with timeout
-        logger.info("Toggling devices in group")
-        try:
-            toggle_result = await asyncio.wait_for(
-                command_service.toggle_group(target_group.name),
-                timeout=10.0
-            )
-            logger.info(f"Toggle result: {toggle_result}")
-        except asyncio.TimeoutError:
-            logger.warning("Toggle operation timed out")
-            
-        # Wait between operations
-        await asyncio.sleep(operation_delay)
-        
-        # Turn off devices with timeout
-        logger.info("Turning off devices in group")
-        try:
-            off_result = await asyncio.wait_for(
-                command_service.turn_off_group(target_group.name),
-                timeout=10.0
-            )
-            logger.info(f"Turn off result: {off_result}")
-        except asyncio.TimeoutError:
-            logger.warning("Turn off operation timed out")
-            
-        # Wait between operations
-        await asyncio.sleep(operation_delay)
-        
-        # Turn on devices with timeout
-        logger.info("Turning on devices in group")
-        try:
-            on_result = await asyncio.wait_for(
-                command_service.turn_on_group(target_group.name),
-                timeout=10.0
-            )
-            logger.info(f"Turn on result: {on_result}")
-        except asyncio.TimeoutError:
-            logger.warning("Turn on operation timed out")
+    # Test operations on the selected group
+    logger.info(f"Testing operations on group: {target_group.name}")
+    
+    # Get status with timeout
+    logger.info("Getting group status")
+    initial_states = {}
+    status_result = await _call_with_timeout("Status", command_service.get_group_status(target_group.name))
+    if status_result is not None:
+        logger.info(f"Status result: {status_result}")
+        initial_states = _switch_states(status_result)
+    
+    # Toggle devices with timeout
+    logger.info("Toggling devices in group")
+    toggle_result = await _call_with_timeout("Toggle", command_service.toggle_group(target_group.name))
+    logger.info(f"Toggle result: {toggle_result}")
         
-        # Stop the command service
-        await command_service.stop()
+    # Wait until the toggled outputs have flipped
+    await _await_state(
+        command_service, target_group.name,
+        lambda states: all(states.get(d) != on for d, on in initial_states.items()),
+        timeout=operation_delay
+    )
+    
+    # Turn off devices with timeout
+    logger.info("Turning off devices in group")
+    off_result = await _call_with_timeout("Turn off", command_service.turn_off_group(target_group.name))
+    logger.info(f"Turn off result: {off_result}")
         
-    finally:
-        # Stop the discovery service
-        await discovery_service.stop()
+    # Wait until every output reports off
+    await _await_state(
+        command_service, target_group.name,
+        lambda states: not any(states.values()),
+        timeout=operation_delay
+    )
+    
+    # Turn on devices with timeout
+    logger.info("Turning on devices in group")
+    on_result = await _call_with_timeout("Turn on", command_service.turn_on_group(target_group.name))
+    logger.info(f"Turn on result: {on_result}")
     
     logger.info("Group operations test completed")
 
 
 # Mock version of the test that doesn't require real network connectivity
 @pytest.mark.asyncio
+@eager_tasks()
 async def test_group_operations_mock():
     """Test group operations functionality with mocks."""
     logger.info("Starting mock group operations test")
     
-    # Initialize the group manager with a mock
-    with patch('shelly_manager.grouping.group_manager.GroupManager') as mock_group_manager_class:
-        # Set up mock group manager to return a mock group
-        mock_group_manager = mock_group_manager_class.return_value
-        mock_group = AsyncMock()
-        mock_group.name = "TestGroup"
-        mock_group_manager.list_groups.return_value = [mock_group]
+    # A single autospecced command service; its async methods become AsyncMocks
+    # and calls to methods GroupCommandService doesn't have fail
+    mock_cmd_service = create_autospec(GroupCommandService, instance=True, spec_set=True)
+    mock_cmd_service.get_group_status.return_value = {"status": "ok"}
+    mock_cmd_service.toggle_group.return_value = {"toggled": True}
+    mock_cmd_service.turn_off_group.return_value = {"turned_off": True}
+    mock_cmd_service.turn_on_group.return_value = {"turned_on": True}
+    
+    # Execute test operations
+    result1 = await mock_cmd_service.get_group_status("TestGroup")
+    result2 = await mock_cmd_service.toggle_group("TestGroup")
+    result3 = await mock_cmd_service.turn_off_group("TestGroup")
+    result4 = await mock_cmd_service.turn_on_group("TestGroup")
+    
+    # Verify results
+    assert result1 == {"status": "ok"}
+    assert result2 == {"toggled": True}
+    assert result3 == {"turned_off": True}
+    assert result4 == {"turned_on": True}
+    
+    logger.info("Mock test completed successfully")
+
+
+@pytest.mark.asyncio
+async def test_await_state_polls_until_predicate_holds():
+    """Test that _await_state returns as soon as the group reaches the expected state."""
+    replies = [
+        {"results": {"gen1": {"success": True, "result": {"relays": [{"ison": True}]}},
+                     "gen2": {"success": True, "result": {"switch:0": {"output": True}}}}},
+        {"results": {"gen1": {"success": True, "result": {"relays": [{"ison": False}]}},
+                     "gen2": {"success": True, "result": {"switch:0": {"output": False}}},
+                     "offline": {"success": False, "error": "Request timed out"}}},
+    ]
+
+    class FakeCommandService:
+        calls = 0
+
+        async def get_group_status(self, group_name):
+            reply = replies[min(self.calls, len(replies) - 1)]
+            self.calls += 1
+            return reply
+
+    service = FakeCommandService()
+    states = await _await_state(service, "TestGroup", lambda s: not any(s.values()), timeout=1.0, poll=0.01)
+
+    assert states == {"gen1": False, "gen2": False}
+    assert service.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_eager_tasks_restores_task_factory():
+    """The eager task factory must not outlive the code it wraps."""
+    loop = asyncio.get_running_loop()
+    previous_factory = loop.get_task_factory()
+
+    async with eager_tasks():
+        if hasattr(asyncio, "eager_task_factory"):
+            assert loop.get_task_factory() is asyncio.eager_task_factory
+
+    assert loop.get_task_factory() is previous_factory
+
+
+async def run_group_operations(group_name=None, discovery_timeout=30, operation_delay=2):
+    """Start the services that the pytest fixtures provide, then run test_group_operations.
+    
+    Args:
+        group_name: Optional name of the group to test.
+        discovery_timeout: Timeout in seconds for device discovery.
+        operation_delay: Maximum time in seconds to wait for devices to settle between operations.
+    """
+    discovery_service = DiscoveryService()
+    logger.info("Starting discovery service")
+    await discovery_service.start()
+    try:
+        logger.info(f"Discovering devices (with {discovery_timeout}s timeout)")
+        try:
+            await asyncio.wait_for(discovery_service.discover_devices(), timeout=float(discovery_timeout))
+        except asyncio.TimeoutError:
+            logger.warning(f"Device discovery timed out after {discovery_timeout} seconds")
         
-        # Create a mock discovery service
-        with patch('shelly_manager.discovery.discovery_service.DiscoveryService') as mock_discovery_class:
-            mock_discovery = mock_discovery_class.return_value
-            
-            # Create a mock command service
-            with patch('shelly_manager.grouping.command_service.GroupCommandService') as mock_cmd_service_class:
-                mock_cmd_service = mock_cmd_service_class.return_value
-                
-                # Set up mock return values as coroutines
-                mock_cmd_service.get_group_status = AsyncMock(return_value={"status": "ok"})
-                mock_cmd_service.toggle_group = AsyncMock(return_value={"toggled": True})
-                mock_cmd_service.turn_off_group = AsyncMock(return_value={"turned_off": True})
-                mock_cmd_service.turn_on_group = AsyncMock(return_value={"turned_on": True})
-                
-                # Execute test operations
-                result1 = await mock_cmd_service.get_group_status("TestGroup")
-                result2 = await mock_cmd_service.toggle_group("TestGroup")
-                result3 = await mock_cmd_service.turn_off_group("TestGroup")
-                result4 = await mock_cmd_service.turn_on_group("TestGroup")
-                
-                # Verify results
-                assert result1 == {"status": "ok"}
-                assert result2 == {"toggled": True}
-                assert result3 == {"turned_off": True}
-                assert result4 == {"turned_on": True}
-                
-                logger.info("Mock test completed successfully")
+        command_service = GroupCommandService(GroupManager(), discovery_service)
+        await command_service.start()
+        try:
+            await test_group_operations(discovery_service, command_service, group_name, operation_delay)
+        finally:
+            await command_service.stop()
+    finally:
+        await discovery_service.stop()
 
 
 def parse_args():
@@ -216,18 +319,21 @@ def parse_args():
     parser = argparse.ArgumentParser(description="Test group operations functionality")
     parser.add_argument("--group", "-g", help="Name of the group to test")
     parser.add_argument("--timeout", "-t", type=int, default=30, help="Timeout in seconds for device discovery")
-    parser.add_argument("--delay", "-d", type=int, default=2, help="Delay in seconds between operations")
+    parser.add_argument("--delay", "-d", type=int, default=2, help="Maximum seconds to wait for devices to settle between operations")
     parser.add_argument("--mock", "-m", action="store_true", help="Run the mock test instead of the real test")
     return parser.parse_args()
 
 
 if __name__ == "__main__":
     args = parse_args()
+    configure_logging(log_to_file=True)
     try:
+        run = uvloop.run if uvloop is not None else asyncio.run
+        # Keep asyncio debug mode off even if PYTHONASYNCIODEBUG is set; its checks slow every callback
         if args.mock:
-            asyncio.run(test_group_operations_mock())
+            run(test_group_operations_mock(), debug=False)
         else:
-            asyncio.run(test_group_operations(args.group, args.timeout, args.delay))
+            run(run_group_operations(args.group, args.timeout, args.delay), debug=False)
     except KeyboardInterrupt:
         logger.info("Test interrupted by user")
     except Exception as e:
@@ -6,37 +6,131 @@ import os
 import shutil
 import tempfile
 from pathlib import Path
+from typing import ClassVar, Tuple
 
-# Add the project directory to the Python path
-import sys
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
 
-from src.shelly_manager.grouping.models import DeviceGroup
-from src.shelly_manager.grouping.group_manager import GroupManager
+from shelly_manager.grouping.models import DeviceGroup
+from shelly_manager.grouping.group_manager import GroupManager
 
 
-class TestGroupManager(unittest.TestCase):
-    """Test the GroupManager class."""
+# Test device IDs
+DEVICE_IDS: Tuple[str, ...] = (
+    "AABBCCDDEEFF",  # Device 1
+    "112233445566",  # Device 2
+    "AABBCCDDEE77",  # Device 3
+    "112233445588"   # Device 4
+)
+
+
+class TestGroupManagerReadOnly(unittest.TestCase):
+    """Test the GroupManager lookups against one shared, prepopulated manager.
+
+    None of these tests change the stored groups, so the groups are created
+    once per class instead of once per test.
+    """
+
+    device_ids: ClassVar[Tuple[str, ...]] = DEVICE_IDS
+
+    @classmethod
+    def setUpClass(cls):
+        """Create the shared groups directory and populate it."""
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.group_manager = GroupManager(groups_dir=cls.temp_dir)
+        cls.group_manager.create_group(
+            name="group1",
+            description="Group 1",
+            device_ids=[cls.device_ids[0], cls.device_ids[1]]
+        )
+        cls.group_manager.create_group(
+            name="group2",
+            description="Group 2",
+            device_ids=[cls.device_ids[1], cls.device_ids[2]]
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the shared groups directory."""
+        shutil.rmtree(cls.temp_dir, ignore_errors=True)
+
+    def test_list_groups(self):
+        """Test listing all groups."""
+        groups = self.group_manager.list_groups()
+        self.assertEqual(len(groups), 2)
+        group_names = [group.name for group in groups]
+        self.assertIn("group1", group_names)
+        self.assertIn("group2", group_names)
+
+    def test_get_groups_for_device(self):
+        """Test getting all groups that contain a specific device."""
+        # Get groups for device 1
+        groups = self.group_manager.get_groups_for_device(self.device_ids[0])
+        self.assertEqual(len(groups), 1)
+        self.assertEqual(groups[0].name, "group1")
+
+        # Get groups for device 2
+        groups = self.group_manager.get_groups_for_device(self.device_ids[1])
+        self.assertEqual(len(groups), 2)
+        group_names = [group.name for group in groups]
+        self.assertIn("group1", group_names)
+        self.assertIn("group2", group_names)
+
+    def test_get_devices_in_group(self):
+        """Test getting all devices in a group."""
+        devices = self.group_manager.get_devices_in_group("group1")
+        self.assertEqual(len(devices), 2)
+        self.assertIn(self.device_ids[0], devices)
+        self.assertIn(self.device_ids[1], devices)
+
+    def test_get_all_devices(self):
+        """Test getting all devices across all groups."""
+        devices = self.group_manager.get_all_devices()
+        self.assertEqual(len(devices), 3)
+        self.assertIn(self.device_ids[0], devices)
+        self.assertIn(self.device_ids[1], devices)
+        self.assertIn(self.device_ids[2], devices)
+
+    def test_group_not_found(self):
+        """Test behavior when a group is not found."""
+        # Try to get a non-existent group
+        group = self.group_manager.get_group("non_existent_group")
+        self.assertIsNone(group)
+
+        # Try to add a device to a non-existent group
+        with self.assertRaises(KeyError):
+            self.group_manager.add_device_to_group("non_existent_group", self.device_ids[0])
+
+        # Try to remove a device from a non-existent group
+        result = self.group_manager.remove_device_from_group("non_existent_group", self.device_ids[0])
+        self.assertFalse(result)
+
+        # Try to get devices in a non-existent group
+        with self.assertRaises(KeyError):
+            self.group_manager.get_devices_in_group("non_existent_group")
+
+        # Try to delete a non-existent group
+        result = self.group_manager.delete_group("non_existent_group")
+        self.assertFalse(result)
+
+
+class TestGroupManagerMutations(unittest.TestCase):
+    """Test the GroupManager operations that change groups, each on a fresh directory."""
+
+    device_ids: ClassVar[Tuple[str, ...]] = DEVICE_IDS
+
+    @pytest.fixture(autouse=True)
+    def _use_tmp_path(self, tmp_path):
+        """Provide a per-test directory managed (and cleaned up) by pytest."""
+        self.temp_dir = str(tmp_path)
 
     def setUp(self):
         """Set up the test environment."""
-        # Create a temporary directory for the group files
-        self.temp_dir = tempfile.mkdtemp()
+        # Outside pytest (plain unittest) there is no tmp_path fixture
+        if not getattr(self, "temp_dir", None):
+            self.temp_dir = tempfile.mkdtemp()
+            self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
         self.group_manager = GroupManager(groups_dir=self.temp_dir)
 
-        # Create some test device IDs
-        self.device_ids = [
-            "AABBCCDDEEFF",  # Device 1
-            "112233445566",  # Device 2
-            "AABBCCDDEE77",  # Device 3
-            "112233445588"   # Device 4
-        ]
-
-    def tearDown(self):
-        """Clean up the test environment."""
-        # Remove the temporary directory
-        shutil.rmtree(self.temp_dir)
-
     def test_create_group(self):
         """Test creating a group."""
         # Create a group
@@ -167,109 +261,6 @@ class TestGroupManager(unittest.TestCase):
         group = new_group_manager.get_group("test_group")
         self.assertNotIn(self.device_ids[0], group.device_ids)
 
-    def test_get_groups_for_device(self):
-        """Test getting all groups that contain a specific device."""
-        # Create two groups with different devices
-        self.group_manager.create_group(
-            name="group1",
-            description="Group 1",
-            device_ids=[self.device_ids[0], self.device_ids[1]]
-        )
-        self.group_manager.create_group(
-            name="group2",
-            description="Group 2",
-            device_ids=[self.device_ids[1], self.device_ids[2]]
-        )
-
-        # Get groups for device 1
-        groups = self.group_manager.get_groups_for_device(self.device_ids[0])
-        self.assertEqual(len(groups), 1)
-        self.assertEqual(groups[0].name, "group1")
-
-        # Get groups for device 2
-        groups = self.group_manager.get_groups_for_device(self.device_ids[1])
-        self.assertEqual(len(groups), 2)
-        group_names = [group.name for group in groups]
-        self.assertIn("group1", group_names)
-        self.assertIn("group2", group_names)
-
-    def test_list_groups(self):
-        """Test listing all groups."""
-        # Create some groups
-        self.group_manager.create_group(
-            name="group1",
-            description="Group 1"
-        )
-        self.group_manager.create_group(
-            name="group2",
-            description="Group 2"
-        )
-
-        # List all groups
-        groups = self.group_manager.list_groups()
-        self.assertEqual(len(groups), 2)
-        group_names = [group.name for group in groups]
-        self.assertIn("group1", group_names)
-        self.assertIn("group2", group_names)
-
-    def test_get_devices_in_group(self):
-        """Test getting all devices in a group."""
-        # Create a group with devices
-        self.group_manager.create_group(
-            name="test_group",
-            description="Test group",
-            device_ids=[self.device_ids[0], self.device_ids[1]]
-        )
-
-        # Get devices in the group
-        devices = self.group_manager.get_devices_in_group("test_group")
-        self.assertEqual(len(devices), 2)
-        self.assertIn(self.device_ids[0], devices)
-        self.assertIn(self.device_ids[1], devices)
-
-    def test_get_all_devices(self):
-        """Test getting all devices across all groups."""
-        # Create groups with different devices
-        self.group_manager.create_group(
-            name="group1",
-            description="Group 1",
-            device_ids=[self.device_ids[0], self.device_ids[1]]
-        )
-        self.group_manager.create_group(
-            name="group2",
-            description="Group 2",
-            device_ids=[self.device_ids[1], self.device_ids[2]]
-        )
-
-        # Get all devices
-        devices = self.group_manager.get_all_devices()
-        self.assertEqual(len(devices), 3)
-        self.assertIn(self.device_ids[0], devices)
-        self.assertIn(self.device_ids[1], devices)
-        self.assertIn(self.device_ids[2], devices)
-
-    def test_group_not_found(self):
-        """Test behavior when a group is not found."""
-        # Try to get a non-existent group
-        group = self.group_manager.get_group("non_existent_group")
-        self.assertIsNone(group)
-
-        # Try to add a device to a non-existent group
-        with self.assertRaises(KeyError):
-            self.group_manager.add_device_to_group("non_existent_group", self.device_ids[0])
-
-        # Try to remove a device from a non-existent group
-        result = self.group_manager.remove_device_from_group("non_existent_group", self.device_ids[0])
-        self.assertFalse(result)
-
-        # Try to get devices in a non-existent group
-        with self.assertRaises(KeyError):
-            self.group_manager.get_devices_in_group("non_existent_group")
-
-        # Try to delete a non-existent group
-        result = self.group_manager.delete_group("non_existent_group")
-        self.assertFalse(result)
-
     def test_duplicate_group_name(self):
         """Test behavior when creating a group with a duplicate name."""
         # Create a group
@@ -285,6 +276,81 @@ class TestGroupManager(unittest.TestCase):
                 description="Another test group"
             )
 
+    def test_device_ids_membership_follows_list_changes(self):
+        """Test that membership checks stay correct when device_ids is edited directly."""
+        group = DeviceGroup(name="test_group", device_ids=[self.device_ids[0]])
+
+        # Direct list edits, as callers do before update_group()
+        group.device_ids.append(self.device_ids[1])
+        group.device_ids.append(self.device_ids[1])
+        group.device_ids.remove(self.device_ids[1])
+        self.assertTrue(group.has_device(self.device_ids[1]))
+        self.assertEqual(group.device_ids.count(self.device_ids[1]), 1)
+
+        group.device_ids[0] = self.device_ids[2]
+        self.assertFalse(group.has_device(self.device_ids[0]))
+        self.assertTrue(group.has_device(self.device_ids[2]))
+
+        # Reassignment keeps list semantics
+        group.device_ids = [self.device_ids[3]]
+        self.assertTrue(group.has_device(self.device_ids[3]))
+        self.assertEqual(group.device_ids, [self.device_ids[3]])
+        self.assertEqual(group.to_dict()["device_ids"], [self.device_ids[3]])
+
+    def test_file_path_cached_until_rename(self):
+        """Test that a group's file path is cached and dropped when it is renamed."""
+        group = self.group_manager.create_group(name="cached path")
+        self.assertEqual(group._file_path, os.path.join(self.temp_dir, "cached_path.yaml"))
+
+        self.group_manager.add_device_to_group("cached path", self.device_ids[0])
+        self.assertTrue(os.path.exists(group._file_path))
+
+        group.name = "renamed"
+        self.assertIsNone(group._file_path)
+
+    def test_groups_for_device_follow_update_and_delete(self):
+        """Test that device lookups reflect groups that were replaced or deleted."""
+        self.group_manager.create_group(name="group1", device_ids=[self.device_ids[0]])
+        self.group_manager.create_group(name="group2", device_ids=[self.device_ids[0]])
+        self.assertEqual(len(self.group_manager.get_groups_for_device(self.device_ids[0])), 2)
+
+        group = self.group_manager.get_group("group1")
+        group.device_ids = [self.device_ids[1]]
+        self.group_manager._update_group(group)
+        self.group_manager._delete_group("group2")
+
+        self.assertEqual(self.group_manager.get_groups_for_device(self.device_ids[0]), [])
+        self.assertEqual(
+            [g.name for g in self.group_manager.get_groups_for_device(self.device_ids[1])],
+            ["group1"]
+        )
+
+    def test_groups_for_device_keep_group_order(self):
+        """Test that groups for a device come back in group order, not index order."""
+        names = [f"room-{letter}" for letter in "hgfedcba"]
+        for name in names:
+            self.group_manager.create_group(name=name)
+        # Join the groups in reverse so membership order differs from group order
+        for name in reversed(names):
+            self.group_manager.add_device_to_group(name, self.device_ids[0])
+
+        self.assertEqual(
+            [g.name for g in self.group_manager.get_groups_for_device(self.device_ids[0])],
+            names
+        )
+
+    def test_all_devices_cached_until_membership_changes(self):
+        """Test that get_all_devices is reused until a device joins or leaves the groups."""
+        self.group_manager.create_group(name="group1", device_ids=[self.device_ids[0]])
+        devices = self.group_manager.get_all_devices()
+        self.assertIs(self.group_manager.get_all_devices(), devices)
+
+        self.group_manager.add_device_to_group("group1", self.device_ids[1])
+        self.assertEqual(self.group_manager.get_all_devices(), {self.device_ids[0], self.device_ids[1]})
+
+        self.group_manager.remove_device_from_group("group1", self.device_ids[0])
+        self.assertEqual(self.group_manager.get_all_devices(), {self.device_ids[1]})
+
 
 if __name__ == "__main__":
     unittest.main() 
\ No newline at end of file
@@ -6,32 +6,38 @@ import os
 import shutil
 import tempfile
 from pathlib import Path
+from typing import ClassVar, Tuple
 
-# Add the project directory to the Python path
-import sys
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
 
-from src.shelly_manager.grouping.models import DeviceGroup
-from src.shelly_manager.grouping.group_manager import GroupManager
+from shelly_manager.grouping.models import DeviceGroup
+from shelly_manager.grouping.group_manager import GroupManager
 
 
 class TestGroupManagerIntegration(unittest.TestCase):
     """Integration tests for the GroupManager with other components."""
 
+    # Test device IDs
+    device_ids: ClassVar[Tuple[str, ...]] = (
+        "AABBCCDDEEFF",  # Living room light
+        "112233445566",  # Kitchen light
+        "AABBCCDDEE77",  # Bedroom outlet
+        "112233445588"   # Outdoor light
+    )
+
+    @pytest.fixture(autouse=True)
+    def _use_tmp_path(self, tmp_path):
+        """Provide a per-test directory managed (and cleaned up) by pytest."""
+        self.temp_dir = str(tmp_path)
+
     def setUp(self):
         """Set up the test environment."""
-        # Create a temporary directory for the group files
-        self.temp_dir = tempfile.mkdtemp()
+        # Outside pytest (plain unittest) there is no tmp_path fixture
+        if not getattr(self, "temp_dir", None):
+            self.temp_dir = tempfile.mkdtemp()
+            self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
         self.group_manager = GroupManager(groups_dir=self.temp_dir)
 
-        # Create some test device IDs
-        self.device_ids = [
-            "AABBCCDDEEFF",  # Living room light
-            "112233445566",  # Kitchen light
-            "AABBCCDDEE77",  # Bedroom outlet
-            "112233445588"   # Outdoor light
-        ]
-
         # Create test groups
         self.group_manager.create_group(
             name="indoor",
@@ -49,11 +55,6 @@ class TestGroupManagerIntegration(unittest.TestCase):
             config={"schedule": "evening"}
         )
 
-    def tearDown(self):
-        """Clean up the test environment."""
-        # Remove the temporary directory
-        shutil.rmtree(self.temp_dir)
-
     def test_file_persistence(self):
         """Test that groups are correctly persisted to files."""
         # Create a new instance of GroupManager pointing to the same directory
@@ -2,26 +2,58 @@
 """Test module for parameter extraction functionality."""
 
 import unittest
-import os
+import functools
+import sys
 import asyncio
 import json
 import pytest
-from unittest.mock import patch, MagicMock, AsyncMock
-
-# Add the src directory to the path
-import sys
 from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+from unittest.mock import patch, MagicMock
+
+from shelly_manager.models.device import Device, DeviceGeneration
+from shelly_manager.utils.json_utils import json_loads
+from shelly_manager.models.device_capabilities import CapabilityDiscovery
+from shelly_manager.parameter.parameter_service import ParameterService
+from shelly_manager.models.parameters import ParameterDefinition, ParameterType
+
+TEST_DATA_DIR = Path(__file__).resolve().parent / "data"
+
+
+@functools.lru_cache(maxsize=16)
+def _load_fixture(filename):
+    """Load and parse a JSON fixture once per process; callers must not modify the result."""
+    try:
+        with open(TEST_DATA_DIR / filename, "rb") as f:
+            content = f.read()
+        return json_loads(content)
+    except FileNotFoundError:
+        # Return empty dict if file doesn't exist yet
+        return {}
+
 
-from src.shelly_manager.models.device import Device, DeviceGeneration
-from src.shelly_manager.models.device_capabilities import CapabilityDiscovery, DeviceCapabilities
-from src.shelly_manager.parameter.parameter_service import ParameterService
-from src.shelly_manager.models.parameters import ParameterDefinition, ParameterType
+class _StubDeviceCapabilities:
+    """Plain stand-in for DeviceCapabilities; cheaper than MagicMock(spec=...)."""
+
+    def get_capability(self, capability_id):
+        return None
+
+    def get_capability_for_device(self, device):
+        return None
+
+    def save_capability(self, capability):
+        return True
 
 
 class TestParameterExtraction(unittest.TestCase):
     """Test class for parameter extraction functionality."""
 
+    FIXTURE_FILES = ("gen1_settings.json", "gen1_status.json", "gen1_shelly.json", "gen2_config.json")
+
+    @classmethod
+    def setUpClass(cls):
+        """Load the JSON fixtures once for all tests; tests must not modify them."""
+        cls._fixtures = {name: cls._load_test_data(name) for name in cls.FIXTURE_FILES}
+
     def setUp(self):
         """Set up test devices."""
         self.gen1_device = Device(
@@ -41,25 +73,19 @@ class TestParameterExtraction(unittest.TestCase):
         )
         
         # Create a capability discovery instance
-        self.mock_capabilities_manager = MagicMock(spec=DeviceCapabilities)
-        self.capability_discovery = CapabilityDiscovery(capabilities_manager=self.mock_capabilities_manager)
+        self.capabilities_manager = _StubDeviceCapabilities()
+        self.capability_discovery = CapabilityDiscovery(capabilities_manager=self.capabilities_manager)
         
-        # Load test data
-        self.gen1_settings_data = self._load_test_data("gen1_settings.json")
-        self.gen1_status_data = self._load_test_data("gen1_status.json")
-        self.gen1_shelly_data = self._load_test_data("gen1_shelly.json")
-        self.gen2_data = self._load_test_data("gen2_config.json")
+        # Test data, parsed once in setUpClass
+        self.gen1_settings_data = self._fixtures["gen1_settings.json"]
+        self.gen1_status_data = self._fixtures["gen1_status.json"]
+        self.gen1_shelly_data = self._fixtures["gen1_shelly.json"]
+        self.gen2_data = self._fixtures["gen2_config.json"]
     
-    def _load_test_data(self, filename):
+    @staticmethod
+    def _load_test_data(filename):
         """Load test data from JSON file."""
-        test_dir = os.path.dirname(os.path.abspath(__file__))
-        data_path = os.path.join(test_dir, "data", filename)
-        try:
-            with open(data_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except FileNotFoundError:
-            # Return empty dict if file doesn't exist yet
-            return {}
+        return _load_fixture(filename)
     
     def test_parameter_mapping(self):
         """Test parameter mapping functionality."""
@@ -129,38 +155,6 @@ class TestParameterExtraction(unittest.TestCase):
         self.assertEqual(parameters["settings_led_mode"]["type"], "string")
         self.assertEqual(parameters["settings_relay0_name"]["type"], "string")
     
-    def test_parameter_type_detection(self):
-        """Test automatic parameter type detection from values."""
-        # Test string detection
-        self.assertEqual(
-            self.capability_discovery._infer_parameter_type("test_string"),
-            "string"
-        )
-        
-        # Test boolean detection
-        self.assertEqual(
-            self.capability_discovery._infer_parameter_type(True),
-            "boolean"
-        )
-        
-        # Test integer detection
-        self.assertEqual(
-            self.capability_discovery._infer_parameter_type(42),
-            "integer"
-        )
-        
-        # Test float detection
-        self.assertEqual(
-            self.capability_discovery._infer_parameter_type(3.14),
-            "float"
-        )
-        
-        # Test null/None handling
-        self.assertEqual(
-            self.capability_discovery._infer_parameter_type(None),
-            "null"
-        )
-    
     def test_skip_internal_fields(self):
         """Test skipping of internal fields during parameter extraction."""
         test_data = {
@@ -187,6 +181,47 @@ class TestParameterExtraction(unittest.TestCase):
         self.assertFalse("settings_relay0__internal" in parameters)
         self.assertTrue("settings_relay0_name" in parameters)
 
+    def test_extract_parameters_deeply_nested(self):
+        """Test that nesting deeper than the recursion limit is extracted."""
+        depth = sys.getrecursionlimit() + 100
+        test_data = leaf = {}
+        for _ in range(depth):
+            leaf["n"] = {}
+            leaf = leaf["n"]
+        leaf["value"] = 1
+        
+        parameters = {}
+        self.capability_discovery._extract_parameters_recursive(
+            data=test_data,
+            parameters=parameters,
+            api_name="test",
+            path_prefix="",
+            path_parts=[]
+        )
+        
+        self.assertEqual(len(parameters), depth + 1)
+        self.assertEqual(parameters["_".join(["n"] * depth + ["value"])]["type"], "integer")
+
+
+@pytest.mark.parametrize("value,expected", [
+    ("test_string", "string"),
+    (True, "boolean"),
+    (42, "integer"),
+    (3.14, "float"),
+    (None, "null"),
+])
+def test_parameter_type_detection(value, expected):
+    """Test automatic parameter type detection from values."""
+    capability_discovery = CapabilityDiscovery(capabilities_manager=_StubDeviceCapabilities())
+    assert capability_discovery._infer_parameter_type(value) == expected
+
+
+def test_json_loads_accepts_non_finite_numbers():
+    """Test that NaN/Infinity, which the json module accepts but orjson rejects, still decode."""
+    data = json_loads(b'{"power": NaN, "limit": Infinity}')
+    assert data["power"] != data["power"]
+    assert data["limit"] == float("inf")
+
 
 # Use pytest for async tests instead of unittest
 @pytest.mark.asyncio
@@ -202,8 +237,8 @@ async def test_gen1_parameter_endpoints():
     )
     
     # Create a capability discovery instance
-    mock_capabilities_manager = MagicMock(spec=DeviceCapabilities)
-    capability_discovery = CapabilityDiscovery(capabilities_manager=mock_capabilities_manager)
+    capabilities_manager = _StubDeviceCapabilities()
+    capability_discovery = CapabilityDiscovery(capabilities_manager=capabilities_manager)
     
     # Create a mock DeviceCapability
     mock_capability = MagicMock()
@@ -255,11 +290,44 @@ async def test_gen1_parameter_endpoints():
         assert "status" in mock_capability.data["apis"]
 
 
+class _FakeResponse:
+    """Minimal stand-in for an aiohttp response used as an async context manager."""
+
+    def __init__(self, payload):
+        self.status = 200 if payload is not None else 404
+        self._payload = payload
+
+    async def json(self, *, loads=json.loads):
+        return loads(json.dumps(self._payload))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class _FakeSession:
+    """Minimal stand-in for aiohttp.ClientSession serving canned JSON by URL path."""
+
+    def __init__(self, responses):
+        self._responses = responses
+
+    def get(self, url, **kwargs):
+        return _FakeResponse(self._responses.get(url.split("/", 3)[-1]))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
 @pytest.mark.asyncio
 async def test_async_parameter_extraction():
     """Test async parameter extraction functionality."""
-    # Create a capability discovery instance with a mock DeviceCapabilities
-    capabilities_manager = MagicMock(spec=DeviceCapabilities)
+    # Create a capability discovery instance with a stub DeviceCapabilities
+    capabilities_manager = _StubDeviceCapabilities()
     capability_discovery = CapabilityDiscovery(capabilities_manager=capabilities_manager)
     
     # Create a test device
@@ -275,38 +343,23 @@ async def test_async_parameter_extraction():
     mock_capability = MagicMock()
     mock_capability.data = {"apis": {}, "parameters": {}, "type_mappings": []}
     
-    # Since we can't easily mock the internal behavior of the method,
-    # let's patch it to directly add parameters to our mock capability
-    async def mock_discover_gen1(*args, **kwargs):
-        # Directly add some test parameters to the mock capability data
-        mock_capability.data["parameters"]["wifi_sta_enabled"] = {
-            "type": "boolean",
-            "description": "WiFi station enabled",
-            "writable": True
-        }
-        mock_capability.data["parameters"]["relay0_ison"] = {
-            "type": "boolean",
-            "description": "Relay state",
-            "writable": True
-        }
-        
-        # Add an API to the mock capability
-        mock_capability.data["apis"]["status"] = {
-            "description": "Status API endpoint",
-            "response_structure": {}
-        }
-        
-        return mock_capability
-    
-    # Apply the patch to the discover_gen1_capabilities method
-    with patch.object(capability_discovery, '_discover_gen1_capabilities', mock_discover_gen1):
-        # Test parameter discovery
+    # Serve canned Gen1 responses through plain stubs rather than AsyncMock chains;
+    # endpoints not listed answer 404
+    session = _FakeSession({
+        "settings": {"name": "plug", "wifi_sta": {"enabled": True}, "_updated_at": 1},
+        "status": {"relays": [{"ison": True}]},
+    })
+    with patch('shelly_manager.models.device_capabilities.aiohttp.ClientSession', return_value=session):
         await capability_discovery._discover_gen1_capabilities(test_device, mock_capability)
-        
-        # Verify parameters were extracted
-        assert len(mock_capability.data["parameters"]) > 0
-        assert "wifi_sta_enabled" in mock_capability.data["parameters"]
-        assert "relay0_ison" in mock_capability.data["parameters"]
+    
+    # Verify parameters were extracted from the responses
+    parameters = mock_capability.data["parameters"]
+    assert "wifi_sta_enabled" in parameters
+    assert parameters["relays[0]_ison"]["type"] == "boolean"
+    assert "_updated_at" not in parameters
+    
+    # Only the endpoints that answered are recorded
+    assert set(mock_capability.data["apis"]) == {"settings", "status"}
 
 
 if __name__ == "__main__":